@@ -0,0 +1,200 @@
+"""Chat-agent benchmark: a fixed query suite replayed through ``NeuroAIChatAgent``.
+
+    python -m benchmarks.bench_chat --sessions 3 --baseline benchmarks/results/chat_agent_<commit>.json
+
+The LLM is a local OpenAI-compatible stub that replays the tool selections and
+tool-internal answers scripted in ``chat_suite.json``, so every run makes the
+same calls. Reports per-turn latency with and without LLM time, LLM calls,
+prompt and observation sizes, and memory per session.
+"""
+import io
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+from langchain_core.callbacks import BaseCallbackHandler
+from neuroaihub.chat_agent.main import NeuroAIChatAgent
+from benchmarks.common import BENCHMARK_DIR, write_results
+from benchmarks.stubs import StubServer, ScriptedChatHandler, ChatScript
+
+SUITE_PATH = f"{BENCHMARK_DIR}/chat_suite.json"
+TURN_METRICS = ("llm_calls", "llm_seconds", "prompt_chars", "max_prompt_chars", "observation_chars")
+
+
+class TurnRecorder(BaseCallbackHandler):
+    """Collects LLM call timings, prompt sizes and tool observations of the current turn."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.llm_started = {}
+        self.llm_seconds = []
+        self.prompt_chars = []
+        self.tools = []
+        self.observation_chars = []
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.llm_started[run_id] = time.perf_counter()
+        self.prompt_chars.append(sum(len(str(m.content)) for batch in messages for m in batch))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self.llm_started.pop(run_id, None)
+        if started is not None:
+            self.llm_seconds.append(time.perf_counter() - started)
+
+    on_llm_error = on_llm_end
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.tools.append(serialized.get("name"))
+
+    def on_tool_end(self, output, **kwargs):
+        self.observation_chars.append(len(str(output)))
+
+    def turn(self):
+        return {
+            "tools": list(self.tools),
+            "llm_calls": len(self.llm_seconds),
+            "llm_seconds": sum(self.llm_seconds),
+            "prompt_chars": sum(self.prompt_chars),
+            "max_prompt_chars": max(self.prompt_chars, default=0),
+            "observation_chars": sum(self.observation_chars),
+        }
+
+
+def new_session(llm_url: str, recorder: TurnRecorder, answer_cache: bool = False) -> NeuroAIChatAgent:
+    with redirect_stdout(io.StringIO()):
+        agent = NeuroAIChatAgent("stub-key", f"{llm_url}/v1", "bench-model", use_answer_cache=answer_cache)
+    agent.llm.callbacks = [recorder]
+    for tool in agent.agent_executor.tools:
+        tool.callbacks = [recorder]
+    return agent
+
+
+def run_session(agent: NeuroAIChatAgent, recorder: TurnRecorder, suite):
+    turns = []
+    for entry in suite:
+        recorder.reset()
+        routed = agent.router.route(entry["query"]) is not None if agent.router is not None else None
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            result = agent.chat(entry["query"])
+        seconds = time.perf_counter() - start
+        turn = recorder.turn()
+        turn.update({
+            "query": entry["query"],
+            "seconds": seconds,
+            "seconds_excluding_llm": seconds - turn["llm_seconds"],
+            "result_rows": 0 if result["data"] is None else len(result["data"]),
+            "has_image": bool(result["image_b64"]),
+            "text_chars": len(result["text"]),
+            "routed": routed,
+        })
+        turns.append(turn)
+    return turns
+
+
+def summarize_turns(sessions):
+    """Median over sessions of every per-turn metric, in suite order."""
+    summary = []
+    for turns in zip(*sessions):
+        first = turns[0]
+        row = {k: first[k] for k in ("query", "tools", "result_rows", "has_image", "routed")}
+        for metric in ("seconds", "seconds_excluding_llm") + TURN_METRICS:
+            values = [t[metric] for t in turns]
+            if isinstance(values[0], float):
+                row[metric] = round(statistics.median(values), 6)
+            else:
+                row[metric] = statistics.median_low(values)
+        summary.append(row)
+    return summary
+
+
+def compare(turns, baseline_path: str, tolerance: float):
+    """Turns whose observation size, prompt size or LLM call count grew by more than ``tolerance``x."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {t["query"]: t for t in json.load(f)["results"]["turns"]}
+    regressions = []
+    for turn in turns:
+        before = baseline.get(turn["query"])
+        if before is None:
+            continue
+        for metric in ("observation_chars", "prompt_chars", "llm_calls", "seconds_excluding_llm"):
+            old, new = before.get(metric) or 0, turn[metric]
+            if old and new > old * tolerance:
+                regressions.append({"query": turn["query"], "metric": metric, "baseline": old, "current": new})
+                print(f"⚠️ {metric} of '{turn['query']}' grew from {old} to {new}.")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark NeuroAIChatAgent against a scripted local LLM.")
+    parser.add_argument("--suite", default=SUITE_PATH, help="JSON query suite with scripted LLM answers")
+    parser.add_argument("--sessions", type=int, default=3, help="timed sessions; one extra traced session measures memory")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per stub LLM request")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="share the process-wide answer cache between sessions (off: every turn runs the agent)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="growth factor reported as a regression")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    with open(args.suite, "r", encoding="utf-8") as f:
+        suite = json.load(f)
+
+    recorder = TurnRecorder()
+    llm = StubServer(ScriptedChatHandler, script=ChatScript(suite), latency=args.llm_latency)
+    with llm:
+        tracemalloc.start()
+        baseline_mb = tracemalloc.get_traced_memory()[0]
+        agent = new_session(llm.url, recorder, args.answer_cache)
+        run_session(agent, recorder, suite)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {
+            "retained_mb": round((current - baseline_mb) / (1024 * 1024), 3),
+            "peak_mb": round((peak - baseline_mb) / (1024 * 1024), 3),
+            "chat_history_messages": len(agent.memory.chat_memory.messages),
+        }
+        del agent
+
+        sessions = []
+        for _ in range(max(1, args.sessions)):
+            agent = new_session(llm.url, recorder, args.answer_cache)
+            sessions.append(run_session(agent, recorder, suite))
+        stub_stats = llm.stats
+
+    turns = summarize_turns(sessions)
+    results = {
+        "config": vars(args),
+        "session_memory": memory,
+        "session_seconds": round(statistics.median(sum(t["seconds"] for t in s) for s in sessions), 6),
+        "session_seconds_excluding_llm": round(
+            statistics.median(sum(t["seconds_excluding_llm"] for t in s) for s in sessions), 6),
+        "llm_calls_per_session": sum(t["llm_calls"] for t in turns),
+        "stub": stub_stats,
+        "turns": turns,
+    }
+    if stub_stats.get("unmatched"):
+        print(f"⚠️ {stub_stats['unmatched']} LLM prompts did not match the suite script.")
+    expected = {entry["query"]: entry["routed"] for entry in suite if "routed" in entry}
+    results["misrouted"] = [t["query"] for t in turns
+                            if t["query"] in expected and t["routed"] is not None and t["routed"] != expected[t["query"]]]
+    for query in results["misrouted"]:
+        print(f"⚠️ '{query}' was {'not ' if expected[query] else ''}routed, contrary to the suite.")
+    if args.baseline:
+        results["regressions"] = compare(turns, args.baseline, args.tolerance)
+
+    print(f"\n🧠 Session: {results['session_seconds']:.3f}s, "
+          f"{results['session_seconds_excluding_llm']:.3f}s excluding LLM, "
+          f"{results['llm_calls_per_session']} LLM calls, {memory['retained_mb']} MB retained")
+    for turn in turns:
+        print(f"  {turn['query'][:44]:<44} {turn['seconds_excluding_llm'] * 1000:9.1f} ms  "
+              f"{turn['llm_calls']:2d} calls  obs {turn['observation_chars']:>8}  prompt {turn['prompt_chars']:>8}")
+    write_results("chat_agent", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
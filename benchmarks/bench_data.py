@@ -0,0 +1,159 @@
+"""Data-layer benchmark: loading, cleaning, options, filters, plot counts and page formatting.
+
+    python -m benchmarks.bench_data --scales 1 100 10000
+
+Each scale is a synthetic registry (see ``synthetic_registry``); results are
+written as JSON under ``benchmarks/results`` for comparison across commits.
+"""
+import os
+import copy
+import json
+import argparse
+import tempfile
+import pandas as pd
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from neuroaihub.chat_agent.storage import SQLiteStore, read_xlsx, clean_sheets, facet_column, memory_usage
+from neuroaihub.chat_agent.data_helpers import get_unique_options_from_column
+from neuroaihub.chat_agent.agent_setup import setup_agent
+from benchmarks.common import measure, write_results, add_web_app_to_path, CACHE_DIR
+from benchmarks.synthetic_registry import generate_registry, load_seed_registry, write_registry
+
+add_web_app_to_path()
+from ui_utils import format_page, top_with_others, download_payload  # noqa: E402
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime  # noqa: E402
+
+OPTION_COLUMNS = [
+    "access_type", "institution", "country", "modality", "format", "segmentation_mask",
+    "disease", "healthy_control", "staging_information", "histopathology", "lab_data"
+]
+FINDER_FILTERS = {
+    "filters": {
+        "disease": "Glioma",
+        "modality": "MRI",
+        "year": {"operator": ">=", "value": 2015},
+    }
+}
+
+
+def finder_tool(combined_df, dataframes, sheet_names, store=None):
+    """The real ``dataset_finder`` tool, with a fake LLM that always returns ``FINDER_FILTERS``."""
+    llm = FakeListChatModel(responses=[json.dumps(FINDER_FILTERS)])
+    executor = setup_agent(llm, combined_df, dataframes, sheet_names, "", "", "fake", _store=store)
+    return next(t for t in executor.tools if t.name == "dataset_finder")
+
+
+def web_find_query(store, columns):
+    return store.query(
+        category="Neoplasm",
+        contains={facet_column(columns, "disease"): ["Glioma", "Meningioma"], facet_column(columns, "modality"): ["MRI"]},
+        equals={facet_column(columns, "access_type"): "Open"},
+        ranges={"year_clean": [(">=", 2010), ("<=", 2025)]},
+    )
+
+
+def bench_scale(scale: int, seed_registry, repeat: int, xlsx_max_rows: int, workdir: str):
+    results = {"scale": scale}
+    raw = generate_registry(scale, seed_registry=seed_registry)
+    rows = sum(len(df) for df in raw.values())
+    results["rows"] = rows
+    print(f"\n📏 Scale {scale}x: {rows} rows")
+
+    _, results["clean"] = measure(
+        lambda frames: clean_sheets(frames), repeat,
+        setup=lambda: {sheet: df.assign(category=sheet) for sheet, df in copy.deepcopy(raw).items()},
+    )
+
+    store = SQLiteStore(os.path.join(workdir, f"registry_{scale}x.sqlite3"))
+    if rows <= xlsx_max_rows:
+        xlsx_path = os.path.join(CACHE_DIR, f"registry_{scale}x.xlsx")
+        if not os.path.exists(xlsx_path):
+            write_registry(raw, xlsx_path)
+
+        def load_xlsx():
+            dataframes, sheet_names = read_xlsx(xlsx_path)
+            return dataframes, pd.concat(dataframes.values(), ignore_index=True), sheet_names
+
+        _, results["load_data_xlsx"] = measure(load_xlsx, repeat)
+        _, results["store_import_xlsx"] = measure(lambda: store.import_xlsx(xlsx_path), 1)
+    else:
+        results["load_data_xlsx"] = {"skipped": f"{rows} rows exceeds --xlsx-max-rows {xlsx_max_rows}"}
+        cleaned = clean_sheets({sheet: df.assign(category=sheet) for sheet, df in raw.items()})
+        _, results["store_import_frames"] = measure(lambda: store.import_dataframes(cleaned, list(raw)), 1)
+        del cleaned
+    del raw
+
+    (dataframes, combined_df, sheet_names), results["load_data_sqlite"] = measure(store.load, repeat)
+    before = memory_usage(dataframes, combined_df)
+    del dataframes, combined_df
+    (dataframes, combined_df, sheet_names), results["load_data_compact"] = measure(lambda: store.load(compact=True), repeat)
+    after = memory_usage(dataframes, combined_df)
+    results["memory"] = {
+        "per_category_copies_mb": round(before / (1024 * 1024), 3),
+        "compact_views_mb": round(after / (1024 * 1024), 3),
+        "reduction": round(before / after, 2) if after else None,
+        "categorical_columns": [c for c in combined_df.columns if isinstance(combined_df[c].dtype, pd.CategoricalDtype)],
+    }
+    print(f"  memory: {results['memory']['per_category_copies_mb']} MB with per-category copies, "
+          f"{results['memory']['compact_views_mb']} MB compact ({results['memory']['reduction']}x)")
+    columns = list(combined_df.columns)
+
+    _, results["unique_options_pandas"] = measure(lambda: [
+        get_unique_options_from_column(combined_df[facet_column(columns, c)])
+        for c in OPTION_COLUMNS if facet_column(columns, c) in columns
+    ], repeat)
+    _, results["unique_options_sqlite"] = measure(lambda: [
+        store.options(facet_column(columns, c)) for c in OPTION_COLUMNS
+    ], repeat)
+
+    pandas_finder = finder_tool(combined_df, dataframes, sheet_names)
+    sqlite_finder = finder_tool(combined_df, dataframes, sheet_names, store)
+    output, results["dataset_finder_pandas"] = measure(lambda: pandas_finder.func("glioma MRI after 2015"), repeat)
+    results["dataset_finder_pandas"]["matches"] = len(json.loads(output).get("data") or [])
+    output, results["dataset_finder_sqlite"] = measure(lambda: sqlite_finder.func("glioma MRI after 2015"), repeat)
+    results["dataset_finder_sqlite"]["matches"] = len(json.loads(output).get("data") or [])
+    results["dataset_finder_sqlite"]["observation_chars"] = len(output)
+
+    found, results["web_find_form"] = measure(lambda: web_find_query(store, columns), repeat)
+    results["web_find_form"]["matches"] = len(found)
+
+    _, results["quick_plot"] = measure(
+        lambda: top_with_others(store.facet_counts(facet_column(columns, "modality")), top=5), repeat
+    )
+
+    # Exactly what a browse download button does on click, through Streamlit's converter.
+    for fmt in ("csv", "jsonl"):
+        payload, results[f"web_download_{fmt}"] = measure(lambda: convert_data_to_bytes_and_infer_mime(
+            download_payload(lambda: store.iter_query(category="Neoplasm"), fmt), TypeError(f"unsupported {fmt} payload")
+        )[0], repeat)
+        results[f"web_download_{fmt}"]["bytes"] = len(payload)
+
+    last_page = max(1, (len(combined_df) - 1) // 5 + 1)
+    _, results["paginated_format_first"] = measure(lambda: format_page(combined_df, 1), repeat)
+    _, results["paginated_format_last"] = measure(lambda: format_page(combined_df, last_page), repeat)
+
+    store.close()
+    for name, stats in results.items():
+        if isinstance(stats, dict) and "seconds_median" in stats:
+            print(f"  {name:<24} {stats['seconds_median'] * 1000:10.2f} ms  peak {stats['peak_mb']:9.2f} MB")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NeuroAIHub data layer on synthetic registries.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--xlsx-max-rows", type=int, default=250000,
+                        help="larger registries skip the xlsx round trip and import DataFrames directly")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    seed_registry = load_seed_registry()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            results.append(bench_scale(scale, seed_registry, args.repeat, args.xlsx_max_rows, workdir))
+    write_results("data_layer", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Offline updater throughput: search, fetch, relevance, extraction and dedupe end to end.
+
+    python -m benchmarks.bench_updater --pages 120 --llm-latency 0.3 --llm-429-rate 0.05
+
+Serper, Tavily, the dataset web pages and the LLM are local stub servers (see
+``stubs``), so the run needs no network or API keys. Reports URLs per minute,
+wall time per pipeline stage and LLM calls per accepted record.
+"""
+import os
+import sqlite3
+import argparse
+import tempfile
+import time
+from collections import Counter
+from neuroaihub.updater import __main__ as updater_main
+from neuroaihub.updater import web_search
+from neuroaihub.updater.dedupe import load_duplicate_index
+from benchmarks.common import write_results
+from benchmarks.synthetic_registry import load_seed_registry
+from benchmarks.stubs import StubServer, CorpusHandler, SearchHandler, LLMStubHandler, build_corpus
+
+# Pipeline order; each stage pulls from the one before it.
+STAGES = [
+    "search_stage", "dedupe_urls", "journal_urls", "fetch_stage", "relevance_stage",
+    "chunk_stage", "batch_stage", "extract_stage", "dedupe_stage",
+]
+
+
+class StageTimer:
+    """Wall time spent in ``next()`` of each stage generator.
+
+    Stages pull lazily from their upstream, so a stage's own time is its total
+    minus the total of the stage it pulls from.
+    """
+
+    def __init__(self):
+        self.total = Counter()
+        self.items = Counter()
+
+    def wrap(self, name, stage):
+        def timed_stage(*args, **kwargs):
+            iterator = iter(stage(*args, **kwargs))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    self.total[name] += time.perf_counter() - start
+                    return
+                self.total[name] += time.perf_counter() - start
+                self.items[name] += 1
+                yield item
+        return timed_stage
+
+    def report(self):
+        report, upstream = {}, 0.0
+        for name in STAGES:
+            if name not in self.total:
+                continue
+            report[name] = {
+                "seconds": round(self.total[name] - upstream, 4),
+                "items": self.items[name],
+            }
+            upstream = self.total[name]
+        return report
+
+
+def journal_counts(journal_path: str):
+    conn = sqlite3.connect(journal_path)
+    try:
+        run_id = conn.execute("SELECT run_id FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()[0]
+        stages = dict(conn.execute(
+            "SELECT stage, COUNT(*) FROM urls WHERE run_id = ? GROUP BY stage", (run_id,)
+        ).fetchall())
+        accepted = conn.execute(
+            "SELECT COUNT(*) FROM records WHERE run_id = ? AND is_new = 1", (run_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return run_id, stages, accepted
+
+
+def run_updater(args, llm_url: str, workdir: str):
+    timer = StageTimer()
+    originals = {name: getattr(updater_main, name) for name in STAGES}
+    journal_path = os.path.join(workdir, "journal.sqlite3")
+    updater = updater_main.NeuroAIUpdater(
+        "stub-key", f"{llm_url}/v1", "bench-model", "stub-serper", "stub-tavily",
+        verbose=args.verbose,
+        max_workers=args.chunk_workers,
+        fetch_workers=args.fetch_workers,
+        extract_workers=args.extract_workers,
+        journal_path=journal_path,
+        batch_token_budget=0 if args.no_batch else 6000,
+        llm_concurrency=args.llm_concurrency,
+    )
+    cwd = os.getcwd()
+    try:
+        for name, stage in originals.items():
+            setattr(updater_main, name, timer.wrap(name, stage))
+        os.chdir(workdir)
+        start = time.perf_counter()
+        updater.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        for name, stage in originals.items():
+            setattr(updater_main, name, stage)
+
+    stages = timer.report()
+    pipeline = timer.total[STAGES[-1]]
+    stages["sink"] = {"seconds": round(elapsed - pipeline, 4)}
+    return elapsed, stages, journal_counts(journal_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NeuroAIHub updater against local stub services.")
+    parser.add_argument("--pages", type=int, default=60, help="documents in the stub web corpus")
+    parser.add_argument("--results-per-query", type=int, default=10)
+    parser.add_argument("--pdf-fraction", type=float, default=0.2)
+    parser.add_argument("--off-topic-fraction", type=float, default=0.15)
+    parser.add_argument("--duplicate-fraction", type=float, default=0.15)
+    parser.add_argument("--page-kb", type=int, nargs=2, default=[4, 40], metavar=("MIN", "MAX"))
+    parser.add_argument("--web-latency", type=float, default=0.05, help="seconds per page request")
+    parser.add_argument("--web-error-rate", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per LLM request")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--llm-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--extract-workers", type=int, default=1)
+    parser.add_argument("--chunk-workers", type=int, default=4)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--no-batch", action="store_true", help="one extraction request per document")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(
+        load_seed_registry(), args.pages, args.pdf_fraction, args.off_topic_fraction,
+        args.duplicate_fraction, tuple(args.page_kb), args.seed,
+    )
+    kinds = Counter(kind for _, _, _, kind in corpus.values())
+    print(f"📚 Stub corpus: {len(corpus)} documents {dict(kinds)}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["NEUROAIHUB_CACHE_DIR"] = os.path.join(workdir, "cache")
+        start = time.perf_counter()
+        load_duplicate_index()
+        index_seconds = time.perf_counter() - start
+
+        web = StubServer(CorpusHandler, corpus=corpus, latency=args.web_latency,
+                         error_rate=args.web_error_rate, seed=args.seed)
+        with web:
+            search = StubServer(SearchHandler, corpus=corpus, corpus_url=web.url, latency=args.search_latency,
+                                results_per_query=args.results_per_query, seed=args.seed)
+            llm = StubServer(LLMStubHandler, latency=args.llm_latency, rate_limit_rate=args.llm_429_rate,
+                             malformed_rate=args.llm_malformed_rate, seed=args.seed)
+            with search, llm:
+                web_search.SERPER_URL = search.url + "/"
+                web_search.TAVILY_URL = search.url
+                elapsed, stages, (run_id, url_stages, accepted) = run_updater(args, llm.url, workdir)
+                llm_stats, web_stats, search_stats = llm.stats, web.stats, search.stats
+
+    urls = sum(url_stages.values())
+    results = {
+        "config": vars(args),
+        "corpus": dict(kinds),
+        "index_build_seconds": round(index_seconds, 4),
+        "seconds": round(elapsed, 4),
+        "urls": urls,
+        "urls_per_minute": round(urls / elapsed * 60, 2) if elapsed else None,
+        "url_outcomes": url_stages,
+        "accepted_records": accepted,
+        "llm_requests": llm_stats.get("requests", 0),
+        "llm_calls_per_accepted_record": round(llm_stats.get("requests", 0) / accepted, 3) if accepted else None,
+        "llm": llm_stats,
+        "web": web_stats,
+        "search": search_stats,
+        "stages": stages,
+    }
+
+    print(f"\n⏱️ {urls} URLs in {elapsed:.2f}s ({results['urls_per_minute']} URLs/min), "
+          f"{accepted} accepted, {results['llm_calls_per_accepted_record']} LLM calls per accepted record")
+    for name, stage in stages.items():
+        print(f"  {name:<16} {stage['seconds']:9.3f} s  {stage.get('items', ''):>6}")
+    write_results("updater_throughput", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+CACHE_DIR = os.path.join(BENCHMARK_DIR, ".cache")
+
+
+def add_web_app_to_path():
+    """The web app's modules import each other as top-level modules."""
+    web_app = os.path.join(REPO_DIR, "web_app")
+    if web_app not in sys.path:
+        sys.path.insert(0, web_app)
+
+
+def measure(func, repeat: int = 3, setup=None):
+    """Run ``func`` ``repeat`` times; returns ``(last_result, stats)``.
+
+    ``setup`` builds a fresh argument for every run outside the timed region.
+    Peak memory is the tracemalloc high-water mark of the first run.
+    """
+    times, peak, result = [], None, None
+    for i in range(max(1, repeat)):
+        arg = setup() if setup else None
+        if i == 0:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func(arg) if setup else func()
+        times.append(time.perf_counter() - start)
+        if i == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, {
+        "seconds_min": round(min(times), 6),
+        "seconds_median": round(statistics.median(times), 6),
+        "peak_mb": round(peak / (1024 * 1024), 3),
+        "repeat": len(times),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def environment() -> dict:
+    import pandas as pd
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(name: str, results: dict, output: str = None) -> str:
+    """Write ``results`` plus environment info as JSON and return the path."""
+    payload = {"benchmark": name, "environment": environment(), "results": results}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{name}_{payload['environment']['commit']}_{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"💾 Results written to {output}")
+    return output
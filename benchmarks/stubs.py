@@ -0,0 +1,426 @@
+"""Local stand-ins for Serper, Tavily, dataset web pages and an OpenAI-compatible LLM.
+
+Every server binds to ``127.0.0.1`` on a free port and runs in a daemon thread,
+so the updater can be driven end to end without network access. Latency, error
+rates and page sizes are configurable; each server counts what it served.
+"""
+import re
+import sys
+import json
+import time
+import random
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from neuroaihub.updater.extractor import field_names
+
+MISSING = "Not specified"
+FILLER = (
+    "The imaging protocol was reviewed by the study team and all scans were checked for quality. "
+    "Participants were recruited across several sites and followed up over multiple visits. "
+)
+OFF_TOPIC = (
+    "Our quarterly newsletter covers campus events, parking changes and the new cafeteria menu. "
+    "Registration for the summer sports programme opens next week for all staff members. "
+)
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        """Clients dropping keep-alive connections is expected, not worth a traceback."""
+        error = sys.exc_info()[1]
+        if not isinstance(error, (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """``QuietHTTPServer`` for ``handler`` with shared ``config`` and ``stats``."""
+
+    def __init__(self, handler, **config):
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.config = config
+        self.httpd.stats = Counter()
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.rng = random.Random(config.get("seed", 0))
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def stats(self) -> dict:
+        with self.httpd.stats_lock:
+            return dict(self.httpd.stats)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def count(self, name, amount=1):
+        with self.server.stats_lock:
+            self.server.stats[name] += amount
+
+    def chance(self, rate) -> bool:
+        with self.server.stats_lock:
+            return self.server.rng.random() < rate
+
+    def delay(self, name="latency"):
+        latency = self.config.get(name, 0.0)
+        if latency:
+            with self.server.stats_lock:
+                jitter = self.server.rng.uniform(0.5, 1.5)
+            time.sleep(latency * jitter)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def send_body(self, status, body: bytes, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+
+# ---------------------------------------------------------------- web corpus
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages) -> bytes:
+    """Minimal PDF with one Helvetica text page per list of lines in ``pages``."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_id = 3 + 2 * len(pages)
+    for i, lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        text = " ".join(f"({_pdf_string(line)}) Tj 0 -14 Td" for line in lines)
+        stream = f"BT /F1 10 Tf 40 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def record_lines(record: dict):
+    """One ``field: value;`` line per metadata field, the format ``LLMStubHandler`` reads back."""
+    return [f"{field}: {str(record.get(field, MISSING)).replace(';', ',')};" for field in field_names]
+
+
+def _padding(text: str, size: int):
+    return [text] * max(0, size // len(text))
+
+
+def build_corpus(registry, pages: int = 60, pdf_fraction: float = 0.2, off_topic_fraction: float = 0.15,
+                 duplicate_fraction: float = 0.15, page_kb=(4, 40), seed: int = 0):
+    """Documents ``{path: (content_type, body, category, kind)}`` built from registry rows.
+
+    ``registry`` maps categories to DataFrames with the database columns. Duplicate
+    pages describe an existing dataset verbatim, new pages a renamed copy with a
+    fresh DOI and URL, off-topic pages have nothing to do with imaging.
+    """
+    rng = random.Random(seed)
+    categories = list(registry)
+    corpus = {}
+    for i in range(pages):
+        category = categories[i % len(categories)]
+        df = registry[category]
+        roll = rng.random()
+        if roll < off_topic_fraction or df.empty:
+            kind, lines = "off_topic", []
+        else:
+            record = {k: v for k, v in df.iloc[rng.randrange(len(df))].items() if isinstance(k, str)}
+            record = {k.lower(): (MISSING if v is None or v != v else v) for k, v in record.items()}
+            record.setdefault("clinical_data_score", record.get("clinical_data", MISSING))
+            if roll < off_topic_fraction + duplicate_fraction:
+                kind = "duplicate"
+            else:
+                kind = "new"
+                record["dataset_name"] = f"{record.get('dataset_name', 'Dataset')} Cohort {i}"
+                record["doi"] = f"10.5555/bench.{seed}.{i}"
+                record["url"] = f"https://example.org/datasets/bench-{seed}-{i}"
+            lines = record_lines(record)
+
+        size = rng.randint(page_kb[0], page_kb[1]) * 1024
+        filler = OFF_TOPIC if kind == "off_topic" else FILLER
+        body_lines = (lines[:1] + _padding(filler, size // 2) + lines[1:] + _padding(filler, size // 2)
+                      if lines else _padding(filler, size))
+        if rng.random() < pdf_fraction:
+            per_page = 40
+            pdf_pages = [body_lines[j:j + per_page] for j in range(0, len(body_lines), per_page)] or [[""]]
+            corpus[f"/pdfs/{i}.pdf"] = ("application/pdf", make_pdf(pdf_pages), category, kind)
+        else:
+            html = "".join(f"<p>{line}</p>\n" for line in body_lines)
+            body = f"<html><head><title>Page {i}</title></head><body><article>\n{html}</article></body></html>"
+            corpus[f"/pages/{i}.html"] = ("text/html; charset=utf-8", body.encode("utf-8"), category, kind)
+    return corpus
+
+
+class CorpusHandler(StubHandler):
+    """Serves ``config["corpus"]`` with ``latency`` and ``error_rate`` (HTTP 500)."""
+
+    def do_GET(self):
+        self.delay()
+        document = self.config["corpus"].get(self.path)
+        if document is None:
+            self.count("not_found")
+            self.send_body(404, b"not found", "text/plain")
+            return
+        if self.chance(self.config.get("error_rate", 0.0)):
+            self.count("errors")
+            self.send_body(500, b"internal error", "text/plain")
+            return
+        content_type, body, _, _ = document
+        self.count("served")
+        self.count("bytes", len(body))
+        self.send_body(200, body, content_type)
+
+
+# ---------------------------------------------------------------- search
+
+def _query_category(query: str, categories):
+    query = query.lower()
+    return next((c for c in categories if c.lower() in query), None)
+
+
+class SearchHandler(StubHandler):
+    """Serper (``POST /``) and Tavily (``POST /search``) answering with corpus URLs.
+
+    Each provider returns ``results_per_query`` URLs of the queried category
+    regardless of the requested count, with ``overlap`` of them shared between
+    the providers, so one query per category can feed a corpus of any size.
+    """
+
+    def do_POST(self):
+        self.delay()
+        payload = self.read_json()
+        tavily = self.path.rstrip("/").endswith("/search")
+        provider = "tavily" if tavily else "serper"
+        self.count(f"{provider}_requests")
+        if self.chance(self.config.get("error_rate", 0.0)):
+            self.count(f"{provider}_errors")
+            self.send_json(500, {"error": "stub search failure"})
+            return
+
+        urls = self.category_urls(payload.get("query" if tavily else "q", ""))
+        per_query = self.config.get("results_per_query", 10)
+        shared = int(per_query * self.config.get("overlap", 0.3))
+        offset = 0 if tavily else per_query - shared
+        picked = urls[offset:offset + per_query]
+        if tavily:
+            self.send_json(200, {"results": [{"title": u, "url": u, "content": ""} for u in picked]})
+        else:
+            self.send_json(200, {"organic": [{"title": u, "link": u} for u in picked]})
+
+    def category_urls(self, query):
+        corpus, base_url = self.config["corpus"], self.config["corpus_url"]
+        categories = sorted({category for _, _, category, _ in corpus.values()})
+        category = _query_category(query, categories)
+        return [f"{base_url}{path}" for path, (_, _, c, _) in corpus.items() if c == category]
+
+
+# ---------------------------------------------------------------- LLM
+
+FIELD_PATTERN = re.compile(r"\b(" + "|".join(field_names) + r"): ([^;]*);")
+DOCUMENT_PATTERN = re.compile(r'<document id="([^"]+)">(.*?)</document>', re.S)
+
+
+def read_record(text: str) -> dict:
+    """The ``record_lines`` fields found in ``text``; absent fields are ``Not specified``."""
+    found = {}
+    for field, value in FIELD_PATTERN.findall(text):
+        found.setdefault(field, value.strip())
+    return {field: found.get(field, MISSING) for field in field_names}
+
+
+class LLMStubHandler(StubHandler):
+    """``POST .../chat/completions`` that "extracts" records by reading ``record_lines`` back.
+
+    ``latency`` is per request, ``rate_limit_rate`` answers 429 with a
+    ``retry_after`` header and ``malformed_rate`` cuts the JSON answer in half.
+    Streaming (SSE) and plain responses are both supported; tool calling is
+    rejected so clients fall back to ``response_format``.
+    """
+
+    def do_POST(self):
+        payload = self.read_json()
+        messages = payload.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        self.count("requests")
+        self.count("prompt_chars", len(prompt))
+        self.delay()
+
+        if payload.get("tools"):
+            self.count("rejected")
+            self.send_json(400, {"error": {"message": "tools are not supported by this model", "type": "invalid_request_error"}})
+            return
+        if self.chance(self.config.get("rate_limit_rate", 0.0)):
+            self.count("rate_limited")
+            self.send_json(429, {"error": {"message": "rate limited", "type": "rate_limit_error"}},
+                           headers={"retry-after": str(self.config.get("retry_after", 0.1))})
+            return
+
+        content = self.answer(prompt)
+        if self.chance(self.config.get("malformed_rate", 0.0)):
+            self.count("malformed")
+            content = content[:len(content) // 2]
+        self.count("completion_chars", len(content))
+        if payload.get("stream"):
+            include_usage = (payload.get("stream_options") or {}).get("include_usage")
+            self.stream(payload.get("model", "stub"), content, len(prompt) if include_usage else None)
+        else:
+            self.send_json(200, self.completion(payload.get("model", "stub"), content, len(prompt)))
+
+    def answer(self, prompt: str) -> str:
+        if "DOCUMENTS TO ANALYZE" in prompt:
+            documents = DOCUMENT_PATTERN.findall(prompt)
+            return json.dumps({"records": [dict(id=doc_id, **read_record(text)) for doc_id, text in documents]})
+        if "TEXT TO ANALYZE" in prompt:
+            return json.dumps(read_record(prompt.split("TEXT TO ANALYZE", 1)[1]))
+        return "pong"
+
+    @staticmethod
+    def completion(model, content, prompt_chars):
+        completion_tokens = max(1, len(content) // 4)
+        prompt_tokens = max(1, prompt_chars // 4)
+        return {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def stream(self, model, content, prompt_chars=None, piece: int = 64):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        event({"role": "assistant", "content": ""})
+        for start in range(0, len(content), piece):
+            event({"content": content[start:start + piece]})
+        event({}, "stop")
+        if prompt_chars is not None:
+            usage = self.completion(model, content, prompt_chars)["usage"]
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+# ---------------------------------------------------------------- chat agent
+
+class ChatScript:
+    """Replays the scripted answers of a chat query suite, matched by the query in each prompt.
+
+    Every suite entry has a ``query`` and ``final`` answer and optionally the
+    ``action``/``action_input`` the agent should pick plus the ``responses`` of
+    the LLM calls the tool makes (``category``, ``summary``, ``filters``,
+    ``advice``). Prompts are recognised by the instructions of the agent and
+    tool prompt templates in ``agent_setup``.
+    """
+
+    def __init__(self, suite):
+        self.by_query = {entry["query"]: entry for entry in suite}
+        # Tools see the agent's action input, or the query itself when a router skips the agent.
+        self.by_input = {entry["query"]: entry for entry in suite}
+        self.by_input.update({entry["action_input"]: entry for entry in suite if entry.get("action_input")})
+        self.by_category = {
+            entry["responses"]["category"]: entry for entry in suite if "category" in entry.get("responses", {})
+        }
+
+    @staticmethod
+    def _quoted(prompt, label):
+        match = re.search(label + r': "(.*?)"\s*$', prompt, re.M)
+        return match.group(1) if match else None
+
+    def respond(self, prompt: str):
+        """``(content, matched)`` for ``prompt``."""
+        if "New input:" in prompt:
+            turn = prompt.rsplit("New input:", 1)[1]
+            entry = self.by_query.get(turn.strip().split("\n", 1)[0].strip())
+            if entry is None:
+                return "Thought: Do I need to use a tool? No\nFinal Answer: I don't know.", False
+            if entry.get("action") and "Observation:" not in turn:
+                return (f"Thought: Do I need to use a tool? Yes\nAction: {entry['action']}\n"
+                        f"Action Input: {entry['action_input']}"), True
+            return f"Thought: Do I need to use a tool? No\nFinal Answer: {entry['final']}", True
+
+        tool_input = self._quoted(prompt, "User Query") or self._quoted(prompt, "Research Goal")
+        entry = self.by_input.get(tool_input)
+        if entry is None:
+            category = re.search(r"Category Name: (.+)$", prompt, re.M)
+            entry = self.by_category.get(category.group(1).strip()) if category else None
+        responses = (entry or {}).get("responses", {})
+        for marker, key in (("classification assistant", "category"), ("summarization expert", "summary"),
+                            ("expert query parser", "filters"), ("research advisor", "advice")):
+            if marker in prompt and key in responses:
+                value = responses[key]
+                return (value if isinstance(value, str) else json.dumps(value)), True
+        return "None", False
+
+
+class ScriptedChatHandler(LLMStubHandler):
+    """``LLMStubHandler`` answering from ``config["script"]``, a ``ChatScript``."""
+
+    def answer(self, prompt: str) -> str:
+        content, matched = self.config["script"].respond(prompt)
+        if not matched:
+            self.count("unmatched")
+        return content
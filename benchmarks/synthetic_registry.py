@@ -0,0 +1,98 @@
+"""Synthetic registries shaped like ``NeuroAIHub_Database.xlsx`` at any multiple of its size."""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from neuroaihub.chat_agent.data_utils import database_path
+
+MULTI_VALUE_COLUMNS = ["modality", "disease", "format", "country", "institution"]
+MISSING = "Not specified"
+
+
+def load_seed_registry(path: str = None):
+    """Raw sheets of the real workbook, exactly as ``pd.read_excel`` returns them."""
+    return pd.read_excel(path or database_path(), sheet_name=None)
+
+
+def _vocabulary(series: pd.Series):
+    values = series.dropna().astype(str).str.split(",").explode().str.strip()
+    return values[(values != "") & (values.str.lower() != MISSING.lower())].unique()
+
+
+def _numeric_jitter(series: pd.Series, rng, low, high, integer=True):
+    numeric = pd.to_numeric(series, errors="coerce")
+    jitter = rng.uniform(low, high, len(series))
+    values = numeric + jitter if low < 0 else numeric * jitter
+    values = values.round() if integer else values
+    return series.where(numeric.isna(), values.astype("Int64").astype(str))
+
+
+def synthesize_sheet(df: pd.DataFrame, scale: int, rng) -> pd.DataFrame:
+    """``scale`` copies of ``df``: the first is the original, the rest perturbed variants."""
+    n = len(df)
+    if scale <= 1 or n == 0:
+        return df.copy()
+
+    extra = df.iloc[rng.integers(0, n, n * (scale - 1))].reset_index(drop=True)
+    copy_id = np.arange(len(extra)) + n
+    suffix = pd.Series(copy_id, dtype="int64").astype(str)
+
+    extra["dataset_name"] = extra["dataset_name"].astype(str) + " [synthetic " + suffix + "]"
+    for col in ("doi", "url"):
+        if col in extra.columns:
+            known = extra[col].notna() & (extra[col].astype(str).str.lower() != MISSING.lower())
+            extra[col] = extra[col].astype(object)
+            extra.loc[known, col] = extra.loc[known, col].astype(str) + "/synthetic-" + suffix[known]
+    if "year" in extra.columns:
+        extra["year"] = _numeric_jitter(extra["year"].astype(object), rng, -3, 3)
+    for col in ("subject_no", "slice_scan_no"):
+        if col in extra.columns:
+            extra[col] = _numeric_jitter(extra[col].astype(object), rng, 0.5, 3.0)
+
+    for col in MULTI_VALUE_COLUMNS:
+        if col not in extra.columns:
+            continue
+        vocabulary = _vocabulary(df[col])
+        if not len(vocabulary):
+            continue
+        remix = rng.random(len(extra)) < 0.5
+        counts = rng.integers(1, 4, int(remix.sum()))
+        picks = rng.choice(vocabulary, int(counts.sum()))
+        values, start = [], 0
+        for count in counts:
+            values.append(", ".join(picks[start:start + count]))
+            start += count
+        extra[col] = extra[col].astype(object)
+        extra.loc[remix, col] = values
+
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def generate_registry(scale: int, seed: int = 0, seed_registry=None):
+    """Raw sheets ``{category: DataFrame}`` with ``scale`` times as many rows as the seed."""
+    rng = np.random.default_rng(seed)
+    seed_registry = seed_registry if seed_registry is not None else load_seed_registry()
+    return {sheet: synthesize_sheet(df, scale, rng) for sheet, df in seed_registry.items()}
+
+
+def write_registry(sheets, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic NeuroAIHub registry workbook.")
+    parser.add_argument("scale", type=int, help="multiple of the real registry size")
+    parser.add_argument("output", help="xlsx path to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    sheets = generate_registry(args.scale, args.seed)
+    write_registry(sheets, args.output)
+    print(f"✅ Wrote {sum(len(df) for df in sheets.values())} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
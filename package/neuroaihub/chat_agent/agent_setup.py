@@ -1,4 +1,5 @@
 import json, re, base64
+from functools import lru_cache
 from io import BytesIO
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,12 +9,21 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_experimental.tools.python.tool import PythonAstREPLTool
 from neuroaihub.chat_agent.data_helpers import get_unique_options_from_column
+from neuroaihub.chat_agent.storage import plain_frame
+from neuroaihub.chat_agent.repl_output import shape_observation, as_table, get_result_store
 
-def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url, model, verbose=False):
+def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url, model, verbose=False, _store=None):
 
     def _col(name): 
         return f"{name}_clean" if f"{name}_clean" in _combined_df.columns else name
 
+    def _options(name):
+        if _col(name) not in _combined_df:
+            return []
+        if _store is not None:
+            return _store.options(_col(name))
+        return get_unique_options_from_column(_combined_df[_col(name)])
+
     def get_category_summary(user_query: str) -> str:
         category_finder_prompt = PromptTemplate.from_template("""
             You are a classification assistant. Your task is to identify which single data category a user is asking about.
@@ -86,28 +96,17 @@ def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url
         )
         parser_chain = parser_prompt | _llm
 
-        all_options = {
-            'category': _sheet_names,
-            'access_type': get_unique_options_from_column(_combined_df[_col('access_type')]) if _col('access_type') in _combined_df else [],
-            'institution': get_unique_options_from_column(_combined_df[_col('institution')]) if _col('institution') in _combined_df else [],
-            'country': get_unique_options_from_column(_combined_df[_col('country')]) if _col('country') in _combined_df else [],
-            'modality': get_unique_options_from_column(_combined_df[_col('modality')]) if _col('modality') in _combined_df else [],
-            'format': get_unique_options_from_column(_combined_df[_col('format')]) if _col('format') in _combined_df else [],
-            'segmentation_mask': get_unique_options_from_column(_combined_df[_col('segmentation_mask')]) if _col('segmentation_mask') in _combined_df else [],
-            'disease': get_unique_options_from_column(_combined_df[_col('disease')]) if _col('disease') in _combined_df else [],
-            'healthy_control': get_unique_options_from_column(_combined_df[_col('healthy_control')]) if _col('healthy_control') in _combined_df else [],
-            'staging_information': get_unique_options_from_column(_combined_df[_col('staging_information')]) if _col('staging_information') in _combined_df else [],
-            'clinical_data_score': get_unique_options_from_column(_combined_df[_col('clinical_data_score')]) if _col('clinical_data_score') in _combined_df else [],
-            'histopathology': get_unique_options_from_column(_combined_df[_col('histopathology')]) if _col('histopathology') in _combined_df else [],
-            'lab_data': get_unique_options_from_column(_combined_df[_col('lab_data')]) if _col('lab_data') in _combined_df else [],
-        }
+        all_options = {'category': _sheet_names}
+        for name in ['access_type', 'institution', 'country', 'modality', 'format', 'segmentation_mask', 'disease',
+                     'healthy_control', 'staging_information', 'clinical_data_score', 'histopathology', 'lab_data']:
+            all_options[name] = _options(name)
 
         prompt_input = {"query": user_query}
         for key, value in all_options.items():
             prompt_input[f"{key}_options"] = value
 
         filter_json_str = parser_chain.invoke(prompt_input).content
-        filtered_df = _combined_df.copy()
+        filtered_df = _combined_df.copy() if _store is None else None
         try:
             clean_json_str = re.sub(r"```json\n?|```", "", filter_json_str).strip()
             parsed = json.loads(clean_json_str)
@@ -115,6 +114,10 @@ def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url
             if not filters:
                 return json.dumps({"summary_text": "I couldn't identify any specific search criteria in your request. Please try again.", "data": None})
 
+            if _store is not None:
+                filtered_df = _store.find(filters)
+                filters = {}
+
             for key, value in filters.items():
                 key_col = _col(key) if key != 'category' else 'category'
 
@@ -196,10 +199,23 @@ def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url
                 "data": None
             })
 
+    @lru_cache(maxsize=1)
+    def repl_frame():
+        # Built on first use: user code sees plain string columns, not the compact categoricals.
+        return plain_frame(_combined_df)
+
     def python_repl_wrapper(code: str) -> str:
         try:
             plt.figure(figsize=(10, 6))
-            tool_result = PythonAstREPLTool(locals={"pd": pd, "combined_df": _combined_df, "plt": plt, "sns": sns}).run(code)
+            tool_result = PythonAstREPLTool(locals={"pd": pd, "combined_df": repl_frame(), "plt": plt, "sns": sns}).run(code)
+            observation, shaped = shape_observation(tool_result)
+            full_result = {}
+            if shaped:
+                try:
+                    full_result["result_id"] = get_result_store().put(as_table(tool_result))
+                except Exception as e:
+                    # The full result is extra; the observation stands without it.
+                    print(f"⚠️ Could not store the full REPL result: {e}")
             fig = plt.gcf()
             if fig.get_axes():
                 buf = BytesIO()
@@ -207,11 +223,11 @@ def setup_agent(_llm, _combined_df, _dataframes, _sheet_names, api_key, base_url
                 buf.seek(0)
                 img_base64 = base64.b64encode(buf.read()).decode('utf-8')
                 plt.close(fig)
-                summary_text = f"Here is the plot you requested. It visualizes the result of your query. The underlying data shows: {str(tool_result)}"
-                return json.dumps({"image": img_base64, "text": summary_text})
+                summary_text = f"Here is the plot you requested. It visualizes the result of your query. The underlying data shows: {observation}"
+                return json.dumps({"image": img_base64, "text": summary_text, **full_result})
             else:
                 plt.close(fig)
-                return json.dumps({"text": str(tool_result)})
+                return json.dumps({"text": observation, **full_result})
         except Exception as e:
             plt.close('all')
             return json.dumps({"text": f"Error executing Python code: {e}"})
@@ -1,36 +1,32 @@
-import pandas as pd
+import os
+import threading
 from importlib import resources
+from neuroaihub.chat_agent.storage import RegistryHandle
 
-def load_data():
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def database_path():
     try:
         with resources.path("neuroaihub", "NeuroAIHub_Database.xlsx") as db_path:
-            xls = pd.ExcelFile(db_path, engine="openpyxl")
+            if not os.path.exists(db_path):
+                raise FileNotFoundError
+            return str(db_path)
     except FileNotFoundError:
         raise FileNotFoundError("NeuroAIHub_Database.xlsx not found in package.")
 
-    sheet_names = xls.sheet_names
-    dataframes = {
-        sheet: pd.read_excel(xls, sheet_name=sheet).assign(category=sheet)
-        for sheet in sheet_names
-    }
 
-    columns_to_clean = [
-    "year", "access_type", "institution", "country", "modality", "resolution",
-    "subject_no", "slice_scan_no", "age_range", "disease", "segmentation_mask",
-    "healthy_control", "staging_information", "clinical_data_score",
-    "histopathology", "lab_data"
-]
-    for sheet, df in dataframes.items():
-        for col in columns_to_clean:
-            if col in df.columns:
-                df[col] = df[col].astype(str).replace("nan", "", regex=False).fillna("")
-                df[f"{col}_clean"] = df[col].str.replace(r"\s*\(.*\)", "", regex=True).str.strip()
+def load_registry(poll_interval: float = 30.0) -> RegistryHandle:
+    """Process-wide ``RegistryHandle`` with its watcher running, shared by every agent."""
+    path = database_path()
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = RegistryHandle(path, poll_interval=poll_interval).start()
+        return _registries[path]
 
-        for col in ["year", "subject_no", "slice_scan_no"]:
-            clean_col = f"{col}_clean"
-            if clean_col in df.columns:
-                df[clean_col] = pd.to_numeric(df[clean_col], errors="coerce")
 
-    combined_df = pd.concat(dataframes.values(), ignore_index=True)
-
-    return dataframes, combined_df, sheet_names
+def load_data():
+    """``(dataframes, combined_df, sheet_names)`` of the registry's current version."""
+    snapshot = load_registry().current()
+    return snapshot.dataframes, snapshot.combined_df, snapshot.sheet_names
@@ -0,0 +1,118 @@
+import io
+import os
+import pandas as pd
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+CHUNK_ROWS = 5000
+
+
+def _parquet_module():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def available_formats():
+    """Export formats usable here; Parquet needs the optional ``pyarrow`` package."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or _parquet_module() is not None]
+
+
+def iter_chunks(source, columns=None, chunk_size: int = CHUNK_ROWS):
+    """DataFrame chunks of ``source`` (a DataFrame or an iterable of DataFrames), projected to ``columns``."""
+    chunks = (
+        (source.iloc[start:start + chunk_size] for start in range(0, len(source), chunk_size))
+        if isinstance(source, pd.DataFrame) else source
+    )
+    for chunk in chunks:
+        if columns is not None:
+            chunk = chunk[[c for c in columns if c in chunk.columns]]
+        yield chunk
+
+
+def _write_csv(chunks, f):
+    rows, header = 0, True
+    for chunk in chunks:
+        f.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+        rows += len(chunk)
+    return rows
+
+
+def _write_jsonl(chunks, f):
+    rows = 0
+    for chunk in chunks:
+        if len(chunk):
+            text = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+            f.write(text.encode("utf-8") + (b"" if text.endswith("\n") else b"\n"))
+        rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, f):
+    pa = _parquet_module()
+    if pa is None:
+        raise ImportError("Parquet export requires the 'pyarrow' package.")
+    writer, rows = None, 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # Columns that are empty in the first chunk would be typed null; store them as strings.
+                schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                writer = pa.parquet.ParquetWriter(f, schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export(source, destination, fmt: str = None, columns=None, chunk_size: int = CHUNK_ROWS) -> int:
+    """Stream ``source`` to ``destination`` (a path or binary file) chunk by chunk; returns the row count.
+
+    ``fmt`` defaults to the extension of ``destination``. Paths are written to a
+    temporary file first, so a failed export never leaves a partial file.
+    """
+    if fmt is None and isinstance(destination, (str, os.PathLike)):
+        fmt = os.path.splitext(str(destination))[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format {fmt!r}; choose one of {', '.join(EXPORT_FORMATS)}.")
+
+    chunks = iter_chunks(source, columns, chunk_size)
+    if not isinstance(destination, (str, os.PathLike)):
+        return WRITERS[fmt](chunks, destination)
+
+    tmp = f"{destination}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            rows = WRITERS[fmt](chunks, f)
+        os.replace(tmp, destination)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+
+def export_to_bytes(source, fmt: str, columns=None, chunk_size: int = CHUNK_ROWS) -> bytes:
+    """The whole export as bytes, for in-memory consumers such as ``st.download_button``.
+
+    Rows are still read chunk by chunk, but the finished file is held in
+    memory; use ``export`` with a path for exports too large for that.
+    """
+    f = io.BytesIO()
+    export(source, f, fmt, columns, chunk_size)
+    return f.getvalue()
@@ -4,43 +4,93 @@ import matplotlib.pyplot as plt
 from IPython.display import display, Image
 from langchain_openai import ChatOpenAI
 from neuroaihub.chat_agent.agent_setup import setup_agent
-from neuroaihub.chat_agent.data_utils import load_data
+from neuroaihub.chat_agent.data_utils import load_registry
 from neuroaihub.chat_agent.memory_utils import DatasetAwareMemory
+from neuroaihub.chat_agent.router import IntentRouter
+from neuroaihub.chat_agent.answer_cache import get_answer_cache, is_cacheable_answer, conversation_digest
+from neuroaihub.chat_agent.export import export as export_rows, CHUNK_ROWS
+from neuroaihub.chat_agent.repl_output import get_result_store
 
 class NeuroAIChatAgent:
-    def __init__(self, api_key, base_url, model, verbose=False):
+    def __init__(self, api_key, base_url, model, verbose=False, route_intents=True, classify_intents=False,
+                 answer_cache=None, use_answer_cache=True):
         self.api_key = api_key.strip()
         self.base_url = base_url.strip()
         self.model = model.strip()
         self.verbose = verbose
+        self.route_intents = route_intents
+        self.classify_intents = classify_intents
+        self.answer_cache = None
+        if use_answer_cache:
+            self.answer_cache = answer_cache if answer_cache is not None else get_answer_cache()
         self.llm = ChatOpenAI(
             openai_api_key=self.api_key,
             base_url=self.base_url,
             model_name=self.model,
             temperature=0
         )
-        self.dataframes, self.combined_df, self.sheet_names = load_data()
+        self.registry = load_registry()
+        self.snapshot = None
+        self._use_snapshot(self.registry.current())
+        self.memory = DatasetAwareMemory(k=5, memory_key="chat_history", return_messages=True)
+        self.last_found_datasets = None
+
+    def _use_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        self.store = snapshot.store
+        self.dataframes, self.combined_df, self.sheet_names = snapshot.dataframes, snapshot.combined_df, snapshot.sheet_names
         self.agent_executor = setup_agent(
             self.llm, self.combined_df, self.dataframes, self.sheet_names,
-            self.api_key, self.base_url, self.model, verbose=self.verbose
+            self.api_key, self.base_url, self.model, verbose=self.verbose, _store=self.store
         )
-        self.memory = DatasetAwareMemory(k=5, memory_key="chat_history", return_messages=True)
-        self.last_found_datasets = None
+        self.router = None
+        if self.route_intents:
+            self.router = IntentRouter(
+                self.agent_executor, self.llm if self.classify_intents else None,
+                columns=self.combined_df.columns, verbose=self.verbose,
+                dataset_names=self.combined_df["dataset_name"]
+            )
 
     def chat(self, query: str):
-        inputs = {"input": query, "chat_history": self.memory.load_memory_variables({})['chat_history']}
-        response = self.agent_executor.invoke(inputs)
+        snapshot = self.registry.current()
+        if snapshot is not self.snapshot:
+            self._use_snapshot(snapshot)
+        memory_variables = self.memory.load_memory_variables({})
+        inputs = {"input": query, "chat_history": memory_variables['chat_history']}
+
+        cache_key = None
+        if self.answer_cache is not None:
+            cache_key = self.answer_cache.key(
+                query, snapshot.version, (self.base_url, self.model, conversation_digest(memory_variables))
+            )
+        cached = self.answer_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            final_answer = cached.pop("output")
+            result = cached
+        else:
+            final_answer, result = self._answer(inputs)
+            if cache_key and is_cacheable_answer(final_answer):
+                self.answer_cache.put(cache_key, dict(result, output=final_answer))
+
+        if result["data"] is not None:
+            self.last_found_datasets = result["data"]
+            self.memory.save_datasets(result["data"])
+        self.memory.save_context(inputs, {"output": final_answer})
+        return result
+
+    def _answer(self, inputs):
+        agent_executor = self.router or self.agent_executor
+        response = agent_executor.invoke(inputs)
         final_answer = response.get('output', "I encountered an issue.")
-        result = {"text": final_answer, "data": None, "image_b64": None}
+        result = {"text": final_answer, "data": None, "image_b64": None, "full_output": None}
         if 'intermediate_steps' in response and response['intermediate_steps']:
             last_action, last_observation = response['intermediate_steps'][-1]
             try:
                 tool_output = json.loads(last_observation)
+                if tool_output.get('result_id'):
+                    result["full_output"] = get_result_store().get(tool_output['result_id'])
                 if 'data' in tool_output and tool_output['data']:
-                    df = pd.DataFrame(tool_output['data'])
-                    self.last_found_datasets = df
-                    self.memory.save_datasets(df)
-                    result["data"] = df
+                    result["data"] = pd.DataFrame(tool_output['data'])
                 if 'image' in tool_output and tool_output['image']:
                     result["image_b64"] = tool_output['image']
                     txt = tool_output.get('text', '')
@@ -50,9 +100,27 @@ class NeuroAIChatAgent:
                     result["text"] = tool_output['text']
             except Exception:
                 pass
-        self.memory.save_context(inputs, {"output": final_answer})
-        return result
+        return final_answer, result
     
+    def export(self, destination, fmt=None, columns=None, filters=None, data=None, chunk_size=CHUNK_ROWS):
+        """Stream ``data``, the datasets matching ``filters`` or the whole registry to CSV, JSONL or Parquet.
+
+        ``filters`` uses the ``dataset_finder`` form, e.g.
+        ``{"disease": "Glioma", "year": {"operator": ">=", "value": 2015}}``;
+        ``data`` is a DataFrame such as ``chat(...)["data"]``. The registry is read
+        at its current version, not the one of the last ``chat`` turn.
+        """
+        store = self.registry.current().store
+        if data is not None:
+            source = data
+        elif filters:
+            source = store.iter_find(filters, columns, chunk_size)
+        else:
+            source = store.iter_query(columns=columns, chunk_size=chunk_size)
+        rows = export_rows(source, destination, fmt, columns, chunk_size)
+        print(f"💾 Exported {rows} datasets to {destination}")
+        return rows
+
     def display(self, result):
         print("\n🧠 NeuroAI says:\n")
         print(result["text"].strip())
@@ -64,6 +132,13 @@ class NeuroAIChatAgent:
             except Exception:
                 print(result["data"].to_string(index=False))
 
+        if result.get("full_output") is not None:
+            print("\n📄 Full result of the code:\n")
+            try:
+                display(result["full_output"])
+            except Exception:
+                print(result["full_output"])
+
         if result["image_b64"]:
             print("\n📈 Showing generated visualization...\n")
             try:
@@ -0,0 +1,110 @@
+import os
+import uuid
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+MAX_OBSERVATION_CHARS = int(os.environ.get("NEUROAIHUB_REPL_MAX_CHARS", 2000))
+MAX_OBSERVATION_TOKENS = int(os.environ.get("NEUROAIHUB_REPL_MAX_TOKENS", 500))
+PREVIEW_ROWS = 5
+CHARS_PER_TOKEN = 4
+
+
+def _to_string(value, width: int = 40) -> str:
+    if isinstance(value, pd.Series):
+        value = value.to_frame(name=value.name if value.name is not None else "value")
+    labels = [str(label) if len(str(label)) <= width else str(label)[:width - 3] + "..." for label in value.index]
+    return value.set_axis(labels).to_string(max_cols=10, max_colwidth=width, line_width=200)
+
+
+def _preview(value, preview_rows: int) -> str:
+    if len(value) <= 2 * preview_rows:
+        return _to_string(value)
+    lines = _to_string(pd.concat([value.head(preview_rows), value.tail(preview_rows)])).splitlines()
+    cut = len(lines) - preview_rows
+    return "\n".join(lines[:cut] + ["..."] + lines[cut:])
+
+
+def summarize_result(value, preview_rows: int = PREVIEW_ROWS) -> str:
+    """Compact text for a REPL result: shape, dtypes and head/tail for DataFrames and Series."""
+    if isinstance(value, pd.DataFrame):
+        dtypes = ", ".join(f"{col}: {dtype}" for col, dtype in value.dtypes.iloc[:20].items())
+        if value.shape[1] > 20:
+            dtypes += f", ... ({value.shape[1] - 20} more)"
+        preview = _preview(value, preview_rows)
+        return f"DataFrame with {len(value)} rows x {value.shape[1]} columns\ndtypes: {dtypes}\n{preview}"
+    if isinstance(value, pd.Series):
+        name = f" '{value.name}'" if value.name is not None else ""
+        return f"Series{name} with {len(value)} values, dtype {value.dtype}\n{_preview(value, preview_rows)}"
+    return str(value)
+
+
+def truncate(text: str, max_chars: int = MAX_OBSERVATION_CHARS, max_tokens: int = MAX_OBSERVATION_TOKENS) -> str:
+    """``text`` cut to both caps, keeping its start and end around a truncation marker."""
+    limit = min(max_chars, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    room = max(0, limit - len(f"\n... [truncated {len(text)} of {len(text)} characters] ...\n"))
+    head, tail = room * 2 // 3, room - room * 2 // 3
+    marker = f"\n... [truncated {len(text) - head - tail} of {len(text)} characters] ...\n"
+    if len(marker) > limit:
+        return text[:limit]
+    return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+def shape_observation(value, max_chars: int = MAX_OBSERVATION_CHARS, max_tokens: int = MAX_OBSERVATION_TOKENS):
+    """``(text, shaped)``: the bounded text for the LLM and whether it differs from ``str(value)``."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return truncate(summarize_result(value), max_chars, max_tokens), True
+    text = str(value)
+    bounded = truncate(text, max_chars, max_tokens)
+    return bounded, bounded != text
+
+
+def as_table(value):
+    """The full result as something a UI can render: a DataFrame for frames and Series, else text."""
+    if isinstance(value, pd.Series):
+        name = value.name if value.name is not None else "value"
+        if name in value.index.names:
+            # e.g. df.groupby("country")["country"].count(); reset_index would collide.
+            name = f"{name}_value"
+        return value.to_frame(name=name).reset_index()
+    if isinstance(value, pd.DataFrame):
+        return value
+    return str(value)
+
+
+class ResultStore:
+    """Thread-safe LRU of full REPL results, kept out of the LLM observation for the UI.
+
+    Observations carry a ``result_id``; callers look the full value up with it.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, value) -> str:
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[result_id] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            return self._entries.get(result_id)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultStore()
+        return _default_store
@@ -1,16 +1,21 @@
-import time
-import pandas as pd
+from itertools import chain
 from neuroaihub.updater.llm_client import LLMClient
-from neuroaihub.updater.query_generator import generate_search_queries
-from neuroaihub.updater.web_search import combined_search
-from neuroaihub.updater.text_fetcher import fetch_text
-from neuroaihub.updater.extractor import extract_dataset_info
-from neuroaihub.updater.updater import (
-    save_new_datasets,
-    load_existing_datasets,
-    filter_new_datasets
+from neuroaihub.updater.dedupe import load_duplicate_index
+from neuroaihub.updater.journal import RunJournal
+from neuroaihub.updater.relevance import RelevanceScorer
+from neuroaihub.updater.pipeline import (
+    query_stage,
+    search_stage,
+    dedupe_urls,
+    journal_urls,
+    fetch_stage,
+    relevance_stage,
+    chunk_stage,
+    batch_stage,
+    extract_stage,
+    dedupe_stage,
+    JsonlSink,
 )
-from neuroaihub.updater.utils import split_text, aggregate_chunk_results
 
 
 class NeuroAIUpdater:
@@ -22,6 +27,22 @@ class NeuroAIUpdater:
         serper_api: str,
         tavily_api: str,
         verbose: bool = False,
+        max_workers: int = 4,
+        required_fields=None,
+        search_workers: int = 8,
+        fetch_workers: int = 4,
+        extract_workers: int = 1,
+        journal_path: str = None,
+        min_relevance: float = 0.25,
+        chunk_tokens: int = 3000,
+        doc_token_budget: int = 12000,
+        batch_token_budget: int = 6000,
+        short_doc_tokens: int = 1500,
+        fetch_options: dict = None,
+        validate_llm: bool = False,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        llm_concurrency: int = 8,
     ):
         self.llm_api_key = llm_api_key.strip()
         self.llm_base_url = llm_base_url.strip()
@@ -29,17 +50,39 @@ class NeuroAIUpdater:
         self.serper_api = serper_api.strip()
         self.tavily_api = tavily_api.strip()
         self.verbose = verbose
-        self.llm = LLMClient(self.llm_api_key, self.llm_base_url, self.llm_model)
+        self.max_workers = max_workers
+        self.required_fields = required_fields
+        self.search_workers = search_workers
+        self.fetch_workers = fetch_workers
+        self.extract_workers = extract_workers
+        self.journal_path = journal_path
+        self.min_relevance = min_relevance
+        self.chunk_tokens = chunk_tokens
+        self.doc_token_budget = doc_token_budget
+        self.batch_token_budget = batch_token_budget
+        self.short_doc_tokens = short_doc_tokens
+        self.fetch_options = fetch_options or {}
+        self.llm = LLMClient(
+            self.llm_api_key, self.llm_base_url, self.llm_model,
+            validate=validate_llm,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrency=llm_concurrency,
+        )
 
     def _log(self, msg):
         if self.verbose:
             print(msg)
 
-    def run(self):
+    def run(self, resume: bool = False):
         self._log("\n✅ LLM configuration successful.")
         self._log("🔍 Starting dataset update process...")
 
-        existing_names, existing_dois, existing_urls = load_existing_datasets()
+        journal = RunJournal(self.journal_path, resume=resume)
+        if journal.resumed:
+            self._log(f"♻️ Resuming run {journal.run_id}.")
+
+        index = load_duplicate_index()
 
         categories = [
             "Neurodegenerative",
@@ -50,65 +93,49 @@ class NeuroAIUpdater:
             "Neurodevelopmental",
         ]
 
-        all_new = []
-
-        for category in categories:
-            self._log(f"\n📂 Processing category: {category}")
-
-            queries = generate_search_queries(category)
-
-            combined_urls = pd.DataFrame()
-            for q in queries:
-                self._log(f"🔍 Searching for: '{q}'")
-                results = combined_search(q, self.serper_api, self.tavily_api)
-                if not results.empty:
-                    combined_urls = pd.concat([combined_urls, results])
-                time.sleep(2)
-
-            if combined_urls.empty:
-                self._log(f"⚠️ No results found for {category}")
-                continue
-
-            combined_urls.drop_duplicates(subset=["url"], inplace=True)
-
-            self._log(f"🔗 {len(combined_urls)} unique URLs collected for {category}.")
-
-            for url in combined_urls['url']:
-                self._log(f"\n🌐 Fetching: {url}")
-
-                text = fetch_text(url)
-                if not text.strip():
-                    self._log("⚠️ Empty or unreadable content, skipping.")
-                    continue
-
-                chunks = split_text(text)
-
-                if len(chunks) == 1:
-                    data = extract_dataset_info(chunks[0], self.llm)
-                    if data:
-                        data["Category"] = category
-                        all_new.append(data)
-                        self._log("✅ Extracted dataset successfully.")
-                else:
-                    chunk_results = []
-                    for chunk in chunks:
-                        chunk_data = extract_dataset_info(chunk, self.llm)
-                        if chunk_data:
-                            chunk_results.append(chunk_data)
-                    if chunk_results:
-                        final_data = aggregate_chunk_results(chunk_results)
-                        final_data["Category"] = category
-                        all_new.append(final_data)
-                        self._log("✅ Extracted dataset successfully.")
-
-                time.sleep(3)
-
-        if all_new:
-            self._log(f"\n💾 {len(all_new)} raw extracted datasets.")
-            filtered = filter_new_datasets(
-                all_new, existing_names, existing_dois, existing_urls
-            )
-            save_new_datasets(filtered)
-            self._log("🎉 Update complete! New results saved.")
+        if journal.has_search_results():
+            urls = ((c, u) for c in categories for u in journal.urls(c))
+        else:
+            urls = journal_urls(dedupe_urls(search_stage(
+                query_stage(categories), self.serper_api, self.tavily_api,
+                workers=self.search_workers, log=self._log
+            )), journal)
+
+        docs = fetch_stage(
+            urls, journal, workers=self.fetch_workers,
+            fetch_options=self.fetch_options, log=self._log
+        )
+        if self.min_relevance is not None:
+            scorer = RelevanceScorer(threshold=self.min_relevance)
+            docs = relevance_stage(docs, scorer, journal=journal, log=self._log)
+        chunked = chunk_stage(docs, self.llm_model, self.chunk_tokens)
+        batched = bool(self.batch_token_budget)
+        if batched:
+            chunked = batch_stage(chunked, self.llm_model, self.batch_token_budget, self.short_doc_tokens)
+        extracted = extract_stage(
+            chunked, self.llm, self.max_workers, self.required_fields,
+            journal=journal, workers=self.extract_workers,
+            token_budget=self.doc_token_budget, batched=batched, log=self._log
+        )
+        if journal.resumed:
+            extracted = chain(journal.records(), extracted)
+        new_records = dedupe_stage(extracted, index, journal=journal, log=self._log)
+
+        sink = JsonlSink(f"new_datasets_{journal.run_id}.jsonl")
+        try:
+            for _, _, data in new_records:
+                sink.write(data)
+                self._log(f"💾 Saved new dataset to {sink.path}: {data.get('dataset_name')}")
+        except BaseException:
+            sink.close(to_excel=False)
+            journal.close()
+            raise
+        saved = sink.close()
+
+        if saved:
+            self._log(f"\n🎉 Update complete! {sink.count} new datasets saved.")
         else:
             self._log("\n⚠️ No new datasets were found during this run.")
+
+        journal.finish()
+        journal.close()
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from neuroaihub.updater.extractor import extract_dataset_info, field_names
+from neuroaihub.updater.utils import aggregate_chunk_results, rank_chunks, get_token_counter
+
+
+def is_complete(aggregated: dict, fields) -> bool:
+    return all(aggregated.get(f, "Not specified") != "Not specified" for f in fields)
+
+
+def select_chunks(chunks, token_budget: int = None, model: str = None):
+    """Chunks in metadata-rank order, truncated to a per-document token budget."""
+    ordered = [chunks[i] for i in rank_chunks(chunks)] if len(chunks) > 1 else list(chunks)
+    if token_budget is None:
+        return ordered
+
+    count_tokens = get_token_counter(model)
+    selected, used = [], 0
+    for chunk in ordered:
+        n = count_tokens(chunk)
+        if selected and used + n > token_budget:
+            break
+        selected.append(chunk)
+        used += n
+    return selected
+
+
+def extract_chunks(chunks, llm, max_workers: int = 4, required_fields=None,
+                   token_budget: int = None, rank: bool = True) -> dict:
+    """Extract chunks concurrently and stop as soon as the required fields are filled.
+
+    With ``rank`` the chunks most likely to hold dataset metadata are visited
+    first, and only as many as fit in ``token_budget`` are considered. At most
+    ``max_workers`` chunks are in flight at any time. Results are aggregated in
+    visiting order, so the outcome matches the sequential
+    ``aggregate_chunk_results`` over the chunks that were actually extracted.
+    """
+    if not chunks:
+        return {}
+
+    if rank:
+        total = len(chunks)
+        chunks = select_chunks(chunks, token_budget, getattr(llm, "model", None))
+        if len(chunks) < total:
+            print(f"✂️ Token budget allows {len(chunks)} of {total} chunk(s).")
+
+    max_workers = max(1, max_workers)
+    fields = list(required_fields) if required_fields else field_names
+    results = {}
+    futures = {}
+    next_idx = 0
+    aggregated = {}
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while next_idx < len(chunks) and len(futures) < max_workers:
+            futures[pool.submit(extract_dataset_info, chunks[next_idx], llm)] = next_idx
+            next_idx += 1
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = futures.pop(future)
+                data = future.result()
+                if data:
+                    results[idx] = data
+
+            aggregated = aggregate_chunk_results([results[i] for i in sorted(results)])
+            if aggregated and is_complete(aggregated, fields):
+                skipped = len(chunks) - len(results)
+                if skipped:
+                    print(f"⏩ All required fields filled, skipping {skipped} remaining chunk(s).")
+                break
+
+            while next_idx < len(chunks) and len(futures) < max_workers:
+                futures[pool.submit(extract_dataset_info, chunks[next_idx], llm)] = next_idx
+                next_idx += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return aggregated
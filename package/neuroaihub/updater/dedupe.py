@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import random
+import hashlib
+import zlib
+from collections import defaultdict
+from importlib import resources
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import pandas as pd
+from neuroaihub.updater.utils import get_cache_dir
+
+MISSING = {"", "not specified", "nan", "none", "n/a", "na"}
+DESCRIPTION_FIELDS = ("institution", "disease", "modality", "year")
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+INDEX_FORMAT = 1
+
+_doi_re = re.compile(r"10\.\d{4,9}/[^\s\"<>]+", re.IGNORECASE)
+
+
+def _missing(value) -> bool:
+    return value is None or (isinstance(value, float) and pd.isna(value)) or str(value).strip().lower() in MISSING
+
+
+def canonical_doi(value) -> str:
+    """``https://doi.org/10.1/ABC.`` -> ``10.1/abc``; empty string if there is no DOI."""
+    if _missing(value):
+        return ""
+    match = _doi_re.search(str(value))
+    if not match:
+        return ""
+    return match.group(0).rstrip(".,;)]").lower()
+
+
+def canonical_url(value) -> str:
+    """Scheme-, ``www.``-, fragment- and trailing-slash-insensitive form of a URL."""
+    if _missing(value):
+        return ""
+    value = str(value).strip()
+    if "://" not in value:
+        value = "http://" + value
+    try:
+        parts = urlsplit(value)
+    except ValueError:
+        return value.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(TRACKING_PREFIXES) or k.lower() in TRACKING_PARAMS)
+    ))
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def normalize_name(value) -> str:
+    """``BraTS 2021`` and ``brats-2021`` both become ``brats2021``."""
+    if _missing(value):
+        return ""
+    return re.sub(r"[^a-z0-9]", "", str(value).lower())
+
+
+def _digits(name: str) -> str:
+    return " ".join(re.findall(r"\d+", name))
+
+
+def shingles(record: dict, k: int = 3) -> set:
+    name = normalize_name(record.get("dataset_name"))
+    result = {name[i:i + k] for i in range(max(1, len(name) - k + 1))} if name else set()
+    for field in DESCRIPTION_FIELDS:
+        value = record.get(field)
+        if not _missing(value):
+            result.update("w:" + w for w in re.findall(r"[a-z0-9]+", str(value).lower()))
+    return result
+
+
+class MinHashLSH:
+    """MinHash signatures bucketed by band, for sub-linear Jaccard candidate lookup."""
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self.perms = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(num_perm)]
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = []
+
+    def signature(self, items) -> tuple:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in items] or [0]
+        return tuple(min((a * h + b) % self.PRIME for h in hashes) for a, b in self.perms)
+
+    def _band_keys(self, sig):
+        for i in range(self.bands):
+            yield i, sig[i * self.rows:(i + 1) * self.rows]
+
+    def add(self, sig) -> int:
+        idx = len(self.signatures)
+        self.signatures.append(sig)
+        for i, key in self._band_keys(sig):
+            self.buckets[i][key].append(idx)
+        return idx
+
+    def query(self, sig, threshold: float):
+        candidates = set()
+        for i, key in self._band_keys(sig):
+            candidates.update(self.buckets[i].get(key, ()))
+        for idx in candidates:
+            other = self.signatures[idx]
+            similarity = sum(1 for x, y in zip(sig, other) if x == y) / self.num_perm
+            if similarity >= threshold:
+                yield idx, similarity
+
+
+class DuplicateIndex:
+    """Canonical-key sets plus a MinHash/LSH index over names and descriptions."""
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16):
+        self.threshold = threshold
+        self.names, self.dois, self.urls = set(), set(), set()
+        self.entry_names = []
+        self.lsh = MinHashLSH(num_perm, bands)
+        self.source_hash = None
+
+    def __len__(self):
+        return len(self.entry_names)
+
+    def add(self, record: dict):
+        name = normalize_name(record.get("dataset_name"))
+        doi = canonical_doi(record.get("doi"))
+        url = canonical_url(record.get("url"))
+        if name:
+            self.names.add(name)
+        if doi:
+            self.dois.add(doi)
+        if url:
+            self.urls.add(url)
+        if name:
+            self.lsh.add(self.lsh.signature(shingles(record)))
+            self.entry_names.append(name)
+
+    def add_keys(self, names=(), dois=(), urls=()):
+        for name in names:
+            self.add({"dataset_name": name})
+        self.dois.update(d for d in map(canonical_doi, dois) if d)
+        self.urls.update(u for u in map(canonical_url, urls) if u)
+
+    def find_duplicate(self, record: dict):
+        """Reason string if ``record`` duplicates an indexed dataset, else ``None``."""
+        name = normalize_name(record.get("dataset_name"))
+        doi = canonical_doi(record.get("doi"))
+        url = canonical_url(record.get("url"))
+        if doi and doi in self.dois:
+            return f"DOI {doi}"
+        if url and url in self.urls:
+            return f"URL {url}"
+        if name and name in self.names:
+            return f"name {name}"
+        if name:
+            digits = _digits(name)
+            sig = self.lsh.signature(shingles(record))
+            for idx, similarity in self.lsh.query(sig, self.threshold):
+                if _digits(self.entry_names[idx]) == digits:
+                    return f"near-duplicate of {self.entry_names[idx]} ({similarity:.2f})"
+        return None
+
+    def save(self, path: str):
+        """Write the key sets and MinHash signatures as JSON; buckets are rebuilt on load."""
+        state = {
+            "format": INDEX_FORMAT,
+            "threshold": self.threshold,
+            "num_perm": self.lsh.num_perm,
+            "bands": self.lsh.bands,
+            "seed": self.lsh.seed,
+            "source_hash": self.source_hash,
+            "names": sorted(self.names),
+            "dois": sorted(self.dois),
+            "urls": sorted(self.urls),
+            "entry_names": self.entry_names,
+            "signatures": [list(sig) for sig in self.lsh.signatures],
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported duplicate index format {state.get('format')!r}.")
+        index = cls(state["threshold"], state["num_perm"], state["bands"])
+        if state["seed"] != index.lsh.seed:
+            index.lsh = MinHashLSH(state["num_perm"], state["bands"], state["seed"])
+        index.names, index.dois, index.urls = set(state["names"]), set(state["dois"]), set(state["urls"])
+        index.entry_names = list(state["entry_names"])
+        for sig in state["signatures"]:
+            index.lsh.add(tuple(sig))
+        index.source_hash = state["source_hash"]
+        return index
+
+
+def workbook_cache_path(prefix: str, database_path: str = None) -> str:
+    """Cache file ``<prefix>_<key>.json`` derived from ``database_path``; each workbook has its own."""
+    database_path = database_path or _database_path()
+    key = hashlib.sha256(os.path.abspath(database_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(get_cache_dir(), f"{prefix}_{key}.json")
+
+
+def default_index_path(database_path: str = None) -> str:
+    return workbook_cache_path("dedupe_index", database_path)
+
+
+def _database_path():
+    with resources.path("neuroaihub", "NeuroAIHub_Database.xlsx") as db_path:
+        return str(db_path)
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def build_duplicate_index(database_path: str = None, **kwargs) -> DuplicateIndex:
+    database_path = database_path or _database_path()
+    index = DuplicateIndex(**kwargs)
+    for df in pd.read_excel(database_path, sheet_name=None).values():
+        df.columns = [c.lower() for c in df.columns]
+        for record in df.to_dict(orient="records"):
+            index.add(record)
+    index.source_hash = _file_hash(database_path)
+    return index
+
+
+def load_duplicate_index(database_path: str = None, index_path: str = None) -> DuplicateIndex:
+    """Load the persisted index, rebuilding it when the database file has changed."""
+    database_path = database_path or _database_path()
+    index_path = index_path or default_index_path(database_path)
+    source_hash = _file_hash(database_path)
+    try:
+        index = DuplicateIndex.load(index_path)
+        if index.source_hash == source_hash:
+            return index
+    except Exception:
+        pass
+    index = build_duplicate_index(database_path)
+    index.save(index_path)
+    print(f"📚 Built duplicate index with {len(index)} datasets.")
+    return index
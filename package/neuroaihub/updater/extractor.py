@@ -46,45 +46,129 @@ RESPONSE FORMAT:
 Return ONLY a valid JSON object with these 22 keys and string values.
 """
 
+batch_extraction_prompt = f"""
+You are a highly accurate assistant specialized in medical imaging datasets.
+
+Your task:
+You will receive several independent documents, each wrapped in <document id="..."> tags.
+For EACH document, extract the following 22 metadata fields about the neuroradiology dataset it describes.
+Use only the text of that document; never mix information between documents.
+
+For each field:
+- Provide a concise string value.
+- If the information is missing or unclear, set the value to "Not specified".
+- Do NOT include extra commentary or Markdown.
+
+FIELDS TO EXTRACT:
+{json.dumps(field_descriptions, indent=2)}
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with a "records" array holding exactly one object per document, in any order.
+Each object must contain an "id" key with the document id plus the 22 keys with string values.
+"""
+
+record_schema = {
+    "type": "object",
+    "properties": {field: {"type": "string"} for field in field_names},
+    "required": field_names,
+    "additionalProperties": False,
+}
+
+batch_record_schema = {
+    "type": "object",
+    "properties": {
+        "records": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, **record_schema["properties"]},
+                "required": ["id"] + field_names,
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["records"],
+    "additionalProperties": False,
+}
+
+
+def normalize_record(data: dict) -> dict:
+    normalized = {}
+    for field in field_names:
+        val = data.get(field, "Not specified")
+        if not isinstance(val, str):
+            val = str(val)
+        val = re.sub(r"\s+", " ", val.strip()) or "Not specified"
+        normalized[field] = val
+    return normalized
+
+
 def extract_dataset_info(text: str, llm):
-    """Extract structured neuroradiology dataset information using the LLM."""
+    """Extract structured neuroradiology dataset information using the LLM; ``{}`` if the call fails."""
     if not text.strip():
         return {f: "Not specified" for f in field_names}
 
     try:
         full_prompt = f"{extraction_prompt}\n\nTEXT TO ANALYZE:\n{text}"
-        response = llm.generate_json(
+        data = llm.generate_json(
             system_prompt="You are a precise JSON-only dataset metadata extractor.",
             user_prompt=full_prompt,
-            max_tokens=5000
+            max_tokens=5000,
+            json_schema=record_schema,
+            schema_name="dataset_metadata"
         )
 
-        if isinstance(response, dict):
-            data = response 
-
-        elif isinstance(response, str):
-            cleaned = response.replace("```json", "").replace("```", "").strip()
-            match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-            if not match:
-                raise ValueError("No valid JSON object found in model output.")
-            json_text = match.group(0)
-            data = json.loads(json_text)
-
-        else:
-            raise TypeError(f"Unexpected LLM output type: {type(response)}")
-
         if not isinstance(data, dict):
             raise ValueError("Extracted data is not a dictionary.")
+        if not any(f in data for f in field_names):
+            # A failed call, or a truncated response that salvaged to nothing usable.
+            if "error" in data:
+                raise ValueError(f"{data['error']}: {str(data.get('raw', ''))[:200]}")
+            raise ValueError("Response has none of the dataset fields.")
 
-        normalized = {}
-        for field in field_names:
-            val = data.get(field, "Not specified")
-            if not isinstance(val, str):
-                val = str(val)
-            val = re.sub(r"\s+", " ", val.strip()) or "Not specified"
-            normalized[field] = val
-        return normalized
+        return normalize_record(data)
 
     except Exception as e:
         print(f"⚠️ Extraction failed: {e}")
-        return {f: "Not specified" for f in field_names}
\ No newline at end of file
+        return {}
+
+
+def extract_dataset_info_batch(documents, llm, max_tokens: int = 8000) -> dict:
+    """Extract several short documents with one LLM call.
+
+    ``documents`` is a list of ``(doc_id, text)`` pairs; returns ``{doc_id: record}``.
+    Items that come back missing, malformed or without all 22 fields are
+    re-extracted one by one with ``extract_dataset_info``.
+    """
+    if len(documents) == 1:
+        doc_id, text = documents[0]
+        return {doc_id: extract_dataset_info(text, llm)}
+
+    body = "\n\n".join(f'<document id="{doc_id}">\n{text}\n</document>' for doc_id, text in documents)
+    response = llm.generate_json(
+        system_prompt="You are a precise JSON-only dataset metadata extractor.",
+        user_prompt=f"{batch_extraction_prompt}\n\nDOCUMENTS TO ANALYZE:\n{body}",
+        max_tokens=max_tokens,
+        json_schema=batch_record_schema,
+        schema_name="dataset_metadata_batch"
+    )
+
+    if isinstance(response, dict):
+        response = response.get("records") or response.get("documents") or []
+    items = response if isinstance(response, list) else []
+
+    texts = dict(documents)
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        doc_id = str(item.get("id", ""))
+        if doc_id in texts and doc_id not in results and all(f in item for f in field_names):
+            results[doc_id] = normalize_record(item)
+
+    missing = [doc_id for doc_id, _ in documents if doc_id not in results]
+    if missing:
+        print(f"🔁 Re-extracting {len(missing)} of {len(documents)} batched document(s) individually.")
+    for doc_id in missing:
+        results[doc_id] = extract_dataset_info(texts[doc_id], llm)
+    return results
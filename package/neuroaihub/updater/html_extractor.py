@@ -0,0 +1,70 @@
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+BOILERPLATE_TAGS = ["script", "style", "noscript", "footer", "header", "nav", "aside", "form", "iframe", "svg"]
+BLOCK_TAGS = ["p", "pre", "li", "td", "dd", "blockquote", "h1", "h2", "h3"]
+
+
+def _text_length(tag) -> int:
+    return len(tag.get_text(" ", strip=True))
+
+
+def _link_density(tag, text_len: int) -> float:
+    if not text_len:
+        return 1.0
+    return sum(_text_length(a) for a in tag.find_all("a")) / text_len
+
+
+def extract_main_content(soup, min_chars: int = 200, min_share: float = 0.2):
+    """Return the element that most likely holds the article or dataset description.
+
+    Readability-style: every text block credits its parent (and half of that to
+    its grandparent) by length and comma count, and the best container is then
+    discounted by its link density. Falls back to the whole body when the
+    winner holds fewer than ``min_chars`` characters or less than ``min_share``
+    of the page text.
+    """
+    body = soup.body or soup
+    candidates, scores = {}, {}
+    for block in body.find_all(BLOCK_TAGS):
+        text = block.get_text(" ", strip=True)
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = block.parent
+        grandparent = parent.parent if parent is not None else None
+        for tag, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if tag is None:
+                continue
+            candidates[id(tag)] = tag
+            scores[id(tag)] = scores.get(id(tag), 0.0) + score * weight
+
+    best, best_score = None, 0.0
+    for key, score in scores.items():
+        tag = candidates[key]
+        score *= 1 - _link_density(tag, _text_length(tag))
+        if tag.name in ("article", "main") or tag.get("role") == "main":
+            score *= 1.25
+        if score > best_score:
+            best, best_score = tag, score
+
+    if best is None:
+        return body
+    total = _text_length(body)
+    best_len = _text_length(best)
+    if best_len < min_chars or (total and best_len / total < min_share):
+        return body
+    return best
+
+
+def html_to_text(content, main_content: bool = True) -> str:
+    soup = BeautifulSoup(content, HTML_PARSER)
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    root = extract_main_content(soup) if main_content else soup
+    return " ".join(root.stripped_strings)
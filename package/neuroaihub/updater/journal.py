@@ -0,0 +1,189 @@
+import os
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from neuroaihub.updater.utils import get_cache_dir
+
+STAGES = ("searched", "fetched", "extracted", "skipped", "failed", "deduped")
+# "failed" (a timeout, server or LLM error) is left out so a resumed run retries it.
+DONE_STAGES = ("extracted", "skipped", "deduped")
+
+
+def default_journal_path() -> str:
+    return os.path.join(get_cache_dir(), "updater_journal.sqlite3")
+
+
+class RunJournal:
+    """SQLite journal of per-URL progress and extracted records for an updater run.
+
+    Every stage transition is committed immediately, so a crashed or killed run can
+    be resumed with ``resume=True`` without repeating finished searches, fetches or
+    LLM extractions.
+    """
+
+    def __init__(self, path: str = None, resume: bool = False, run_id: str = None):
+        self.path = path or default_journal_path()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at TEXT,
+                searched_at TEXT,
+                finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                run_id TEXT,
+                category TEXT,
+                url TEXT,
+                stage TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (run_id, category, url)
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                run_id TEXT,
+                category TEXT,
+                url TEXT,
+                data TEXT,
+                is_new INTEGER,
+                PRIMARY KEY (run_id, category, url)
+            );
+        """)
+
+        if resume and run_id is None:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+            run_id = row[0] if row else None
+
+        self.resumed = run_id is not None and self.conn.execute(
+            "SELECT 1 FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone() is not None
+        self.run_id = run_id or f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
+        if not self.resumed:
+            self._execute(
+                "INSERT INTO runs (run_id, started_at) VALUES (?, ?)",
+                (self.run_id, datetime.now().isoformat()),
+            )
+
+    @staticmethod
+    def has_run(run_id: str, path: str = None) -> bool:
+        """Whether ``run_id`` is in the journal, checked read-only so no run is created."""
+        path = path or default_journal_path()
+        if not os.path.exists(path):
+            return False
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is not None
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            conn.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def _set_stage(self, category, url, stage):
+        self._execute(
+            "INSERT INTO urls (run_id, category, url, stage, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(run_id, category, url) DO UPDATE SET stage = excluded.stage, updated_at = excluded.updated_at",
+            (self.run_id, category, url, stage, datetime.now().isoformat()),
+        )
+
+    def add_urls(self, category, urls):
+        now = datetime.now().isoformat()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (run_id, category, url, stage, updated_at) VALUES (?, ?, ?, 'searched', ?)",
+                [(self.run_id, category, url, now) for url in urls],
+            )
+            self.conn.commit()
+
+    def urls(self, category):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url FROM urls WHERE run_id = ? AND category = ? ORDER BY rowid",
+                (self.run_id, category),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def mark_searched(self):
+        self._execute(
+            "UPDATE runs SET searched_at = ? WHERE run_id = ?",
+            (datetime.now().isoformat(), self.run_id),
+        )
+
+    def has_search_results(self):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT searched_at FROM runs WHERE run_id = ?", (self.run_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def stage(self, category, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT stage FROM urls WHERE run_id = ? AND category = ? AND url = ?",
+                (self.run_id, category, url),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, category, url):
+        return self.stage(category, url) in DONE_STAGES
+
+    def mark_fetched(self, category, url):
+        self._set_stage(category, url, "fetched")
+
+    def mark_skipped(self, category, url):
+        self._set_stage(category, url, "skipped")
+
+    def mark_failed(self, category, url):
+        self._set_stage(category, url, "failed")
+
+    def save_record(self, category, url, data: dict):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO records (run_id, category, url, data, is_new) VALUES (?, ?, ?, ?, NULL)",
+                (self.run_id, category, url, json.dumps(data, ensure_ascii=False)),
+            )
+            self.conn.execute(
+                "UPDATE urls SET stage = 'extracted', updated_at = ? WHERE run_id = ? AND category = ? AND url = ?",
+                (datetime.now().isoformat(), self.run_id, category, url),
+            )
+            self.conn.commit()
+
+    def records(self, only_new: bool = False):
+        sql = "SELECT category, url, data FROM records WHERE run_id = ?"
+        if only_new:
+            sql += " AND is_new = 1"
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY rowid", (self.run_id,)).fetchall()
+        return [(category, url, json.loads(data)) for category, url, data in rows]
+
+    def mark_deduped(self, category, url, is_new: bool):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE records SET is_new = ? WHERE run_id = ? AND category = ? AND url = ?",
+                (int(is_new), self.run_id, category, url),
+            )
+            self.conn.execute(
+                "UPDATE urls SET stage = 'deduped', updated_at = ? WHERE run_id = ? AND category = ? AND url = ?",
+                (datetime.now().isoformat(), self.run_id, category, url),
+            )
+            self.conn.commit()
+
+    def finish(self):
+        self._execute(
+            "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+            (datetime.now().isoformat(), self.run_id),
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,102 @@
+import json
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """Scans JSON text as it streams in and remembers the last safe cut point.
+
+    A cut point is a position where every value seen so far is complete, so
+    ``salvage`` can close the open containers there and recover all finished
+    fields of a response that was truncated mid-value. Cut points are taken at
+    commas and closers and right after each string value.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.length = 0
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.string_is_key = False
+        self.started = False
+        self.cut = None
+        self.cut_closers = ""
+
+    def feed(self, text: str):
+        if not text:
+            return
+        if not self.started:
+            start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+            if start < 0:
+                return
+            text = text[start:]
+            self.started = True
+
+        offset = self.length
+        self.buffer.append(text)
+        self.length += len(text)
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if not self.string_is_key:
+                        self._mark(offset + i + 1)
+                continue
+            if ch == '"':
+                self.in_string = True
+                self.string_is_key = self.expect_key
+            elif ch in CLOSERS:
+                self.stack.append(CLOSERS[ch])
+                self.expect_key = ch == "{"
+                self._mark(offset + i + 1)
+            elif ch in "}]" and self.stack:
+                self.stack.pop()
+                self._mark(offset + i + 1)
+            elif ch == "," and self.stack:
+                self.expect_key = self.stack[-1] == "}"
+                self._mark(offset + i)
+            elif ch == ":":
+                self.expect_key = False
+
+    def _mark(self, position: int):
+        self.cut = position
+        self.cut_closers = "".join(reversed(self.stack))
+
+    @property
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+    @property
+    def complete(self) -> bool:
+        return self.started and not self.stack and not self.in_string
+
+    def salvage(self):
+        """Parse the full text, or the longest complete prefix if it was cut off."""
+        text = self.text
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        if self.cut is None:
+            return None
+        prefix = text[:self.cut].rstrip()
+        # A cut after an object key's colon or trailing comma cannot be closed as is.
+        while prefix and prefix[-1] in ",:":
+            prefix = prefix[:-1].rstrip()
+        try:
+            return json.loads(prefix + self.cut_closers)
+        except json.JSONDecodeError:
+            return None
+
+
+def parse_json(text: str):
+    """Parse a JSON value from model output, salvaging what it can if truncated."""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.salvage()
@@ -1,19 +1,59 @@
 from openai import OpenAI
+import openai
 import json
 import time
+from neuroaihub.updater.rate_limit import (
+    TokenBucket,
+    AdaptiveConcurrency,
+    retry_after_seconds,
+    backoff_delay,
+)
+from neuroaihub.updater.utils import get_token_counter
+from neuroaihub.updater.json_stream import IncrementalJSONParser
+
+STRUCTURED_MODES = ("json_schema", "tools", "json_object", "text")
+
+NON_RETRYABLE_ERRORS = (
+    openai.BadRequestError,
+    openai.AuthenticationError,
+    openai.PermissionDeniedError,
+    openai.NotFoundError,
+)
+
+
+def is_rate_limited(error) -> bool:
+    return isinstance(error, openai.RateLimitError) or getattr(error, "status_code", None) == 429
+
+
+def rejects_structured_output(error) -> bool:
+    message = str(error).lower()
+    return isinstance(error, openai.BadRequestError) and any(
+        k in message for k in ("response_format", "json_schema", "tool", "not support", "unsupported")
+    )
+
 
 class LLMClient:
-    def __init__(self, api_key: str, base_url: str, model: str):
+    def __init__(self, api_key: str, base_url: str, model: str, validate: bool = False,
+                 requests_per_minute: float = None, tokens_per_minute: float = None,
+                 max_concurrency: int = 8, structured_output: str = "auto", stream: bool = True):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(initial=max(1, max_concurrency // 2), maximum=max_concurrency)
+        self.count_tokens = get_token_counter(model)
+        self.stream = stream
+        # "auto" starts with JSON-schema output and falls back on the first rejection.
+        self.structured_modes = list(STRUCTURED_MODES) if structured_output == "auto" else [structured_output]
 
         try:
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
-            self.validate_connection()
+            self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            if validate:
+                self.validate_connection()
         except Exception as e:
             raise RuntimeError(f"❌ Failed to initialize LLM client: {e}")
-        
+
     def validate_connection(self):
         try:
             response = self.client.chat.completions.create(
@@ -25,62 +65,168 @@ class LLMClient:
         except Exception as e:
             raise RuntimeError(f"⚠️ LLM connection test failed: {e}")
 
-    def generate(self, prompt: str, temperature: float = 0.0, max_retries: int = 3) -> str:
-        """Generate plain text completion with retry logic."""
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful and precise AI assistant."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=temperature,
-                    max_tokens=5000
-                )
-                return response.choices[0].message.content.strip()
+    def _complete(self, max_retries: int = 3, label: str = "LLM request", read=None, **kwargs):
+        """chat.completions.create behind the rate limiters, with backoff on failure.
 
-            except Exception as e:
-                print(f"⚠️ LLM request failed (attempt {attempt}/{max_retries}): {e}")
-                if attempt < max_retries:
-                    time.sleep(2 * attempt)
-                else:
-                    raise RuntimeError(f"LLM request failed after {max_retries} attempts: {e}")
+        ``read(response)`` returns ``(result, usage)`` and runs inside the
+        concurrency slot, so a streamed generation holds its slot until it has
+        been consumed; ``_complete`` then returns ``result``.
+        """
+        estimate = sum(self.count_tokens(m["content"]) for m in kwargs["messages"])
+        estimate += min(kwargs.get("max_tokens") or 1024, 1024)
 
-    def generate_json( self, system_prompt: str = "", user_prompt: str = "", schema_hint: dict = None, temperature: float = 0.0, 
-                      max_retries: int = 3, max_tokens: int = 5000) -> dict:
         for attempt in range(1, max_retries + 1):
+            if self.request_bucket:
+                self.request_bucket.acquire(1)
+            if self.token_bucket:
+                self.token_bucket.acquire(estimate)
+
             try:
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                if user_prompt:
-                    messages.append({"role": "user", "content": user_prompt})
-
-                if schema_hint:
-                    messages.append({
-                        "role": "user",
-                        "content": f"Return ONLY valid JSON matching this schema: {json.dumps(schema_hint)}"
-                    })
-
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
+                with self.concurrency:
+                    response = self.client.chat.completions.create(model=self.model, **kwargs)
+                    result, usage = read(response) if read else (response, getattr(response, "usage", None))
+            except Exception as e:
+                if is_rate_limited(e):
+                    self.concurrency.on_rate_limited()
+                tries = f" (attempt {attempt}/{max_retries})" if max_retries > 1 else ""
+                print(f"⚠️ {label} failed{tries}: {e}")
+                if attempt == max_retries or isinstance(e, NON_RETRYABLE_ERRORS):
+                    raise
+                time.sleep(backoff_delay(attempt, retry_after_seconds(e)))
+                continue
 
-                output = response.choices[0].message.content.strip()
-                output_clean = output.replace("```json", "").replace("```", "").strip()
+            self.concurrency.on_success()
+            if self.token_bucket and usage is not None and usage.total_tokens:
+                self.token_bucket.adjust(usage.total_tokens - estimate)
+            return result
 
+    def generate(self, prompt: str, temperature: float = 0.0, max_retries: int = 3) -> str:
+        """Generate plain text completion with retry logic."""
+        try:
+            response = self._complete(
+                max_retries=max_retries,
+                messages=[
+                    {"role": "system", "content": "You are a helpful and precise AI assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=5000
+            )
+        except Exception as e:
+            raise RuntimeError(f"LLM request failed after {max_retries} attempts: {e}")
+        return response.choices[0].message.content.strip()
+
+    def _structured_kwargs(self, mode: str, schema: dict, name: str) -> dict:
+        if mode == "json_schema":
+            return {"response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema, "strict": True},
+            }}
+        if mode == "tools":
+            return {
+                "tools": [{"type": "function", "function": {"name": name, "parameters": schema}}],
+                "tool_choice": {"type": "function", "function": {"name": name}},
+            }
+        if mode == "json_object":
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
+    def _read_json(self, response, parser: IncrementalJSONParser):
+        """Feed a streamed or plain response into ``parser``; returns ``(finish_reason, usage)``.
+
+        Streams report usage in a final chunk without choices.
+        """
+        if not self.stream:
+            choice = response.choices[0]
+            message = choice.message
+            if message.tool_calls:
+                parser.feed(message.tool_calls[0].function.arguments)
+            else:
+                parser.feed(message.content or "")
+            return choice.finish_reason, getattr(response, "usage", None)
+
+        finish_reason, usage = None, None
+        for chunk in response:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.tool_calls:
+                parser.feed(delta.tool_calls[0].function.arguments or "")
+            elif delta.content:
+                parser.feed(delta.content)
+            finish_reason = choice.finish_reason or finish_reason
+        return finish_reason, usage
+
+    def generate_json(self, system_prompt: str = "", user_prompt: str = "", schema_hint: dict = None, temperature: float = 0.0,
+                      max_retries: int = 3, max_tokens: int = 5000, json_schema: dict = None,
+                      schema_name: str = "response"):
+        """Generate a JSON value, using structured output when ``json_schema`` is given.
+
+        The endpoint is tried with JSON-schema response formatting, then tool
+        calling, then JSON mode, then plain text; a mode the endpoint rejects
+        is dropped for the rest of the client's life. Output is parsed
+        incrementally, so a truncated response still yields its completed
+        fields instead of triggering a full regeneration.
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        if user_prompt:
+            messages.append({"role": "user", "content": user_prompt})
+
+        if schema_hint:
+            messages.append({
+                "role": "user",
+                "content": f"Return ONLY valid JSON matching this schema: {json.dumps(schema_hint)}"
+            })
+
+        raw = ""
+        attempt = 0
+        while attempt < max_retries:
+            mode = self.structured_modes[0] if json_schema else "text"
+            parser = IncrementalJSONParser()
+
+            def read(response):
                 try:
-                    return json.loads(output_clean)
-                except json.JSONDecodeError:
-                    print("⚠️ LLM returned invalid JSON")
+                    return self._read_json(response, parser)
+                except Exception as e:
+                    print(f"⚠️ LLM stream interrupted: {e}")
+                    return "length", None
 
+            stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}} if self.stream else {}
+            try:
+                # One call per attempt: failed calls and invalid JSON share the retry budget.
+                finish_reason = self._complete(
+                    max_retries=1,
+                    label=f"JSON generation attempt {attempt + 1}/{max_retries}",
+                    read=read,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **stream_kwargs,
+                    **self._structured_kwargs(mode, json_schema, schema_name)
+                )
+            except NON_RETRYABLE_ERRORS as e:
+                if json_schema and mode != "text" and len(self.structured_modes) > 1 and rejects_structured_output(e):
+                    print(f"⚠️ Endpoint rejected {mode} output, falling back: {e}")
+                    self.structured_modes = [m for m in self.structured_modes if m != mode]
+                    continue
+                break
             except Exception as e:
-                print(f"⚠️ JSON generation failed (attempt {attempt}/{max_retries}): {e}")
+                attempt += 1
                 if attempt < max_retries:
-                    time.sleep(2 * attempt)
-                else:
-                    return {"error": f"Failed after {max_retries} attempts", "raw": output_clean if 'output_clean' in locals() else ""}
\ No newline at end of file
+                    time.sleep(backoff_delay(attempt, retry_after_seconds(e)))
+                continue
+
+            attempt += 1
+            raw = parser.text
+            data = parser.salvage()
+            if data is not None:
+                if not parser.complete or finish_reason == "length":
+                    print("⚠️ LLM output was truncated, keeping the completed fields.")
+                return data
+            print("⚠️ LLM returned invalid JSON")
+
+        return {"error": f"Failed after {max_retries} attempts", "raw": raw}
@@ -0,0 +1,173 @@
+import os
+import json
+import argparse
+from datetime import datetime
+from openpyxl import load_workbook
+from neuroaihub.updater.dedupe import _database_path, _file_hash, default_index_path, load_duplicate_index
+from neuroaihub.updater.journal import RunJournal
+
+# Extractor fields whose sheet header differs; the first header present on a sheet wins.
+FIELD_ALIASES = {
+    "clinical_data_score": ("clinical_data",),
+    "slice_scan_no": ("subject_no_f",),
+}
+# Keys the pipeline adds to a record that are not sheet columns.
+RECORD_METADATA = {"category"}
+
+
+def target_column(columns: dict, field: str):
+    """Sheet column number for a record ``field``, trying its aliases; ``None`` if the sheet has none."""
+    for name in (field, *FIELD_ALIASES.get(field, ())):
+        if name.lower() in columns:
+            return columns[name.lower()]
+    return None
+
+
+def records_from_jsonl(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                yield data.get("Category"), data
+
+
+def records_from_journal(run_id: str, journal_path: str = None):
+    # Opening a RunJournal for an unknown id would start a new run that resume then picks up.
+    if not RunJournal.has_run(run_id, journal_path):
+        raise ValueError(f"Run {run_id} not found in the journal.")
+    journal = RunJournal(journal_path, run_id=run_id)
+    try:
+        for category, _, data in journal.records(only_new=True):
+            yield category, data
+    finally:
+        journal.close()
+
+
+def _last_row(ws) -> int:
+    """Last row with a dataset name; trailing formatted-but-empty rows are reused."""
+    for row in range(ws.max_row, 1, -1):
+        if ws.cell(row, 1).value not in (None, ""):
+            return row
+    return 1
+
+
+def _deltas_dir(database_path: str) -> str:
+    base, _ = os.path.splitext(database_path)
+    return f"{base}_deltas"
+
+
+def _next_version(deltas_dir: str) -> int:
+    versions = [int(name.split(".")[0]) for name in os.listdir(deltas_dir) if name.split(".")[0].isdigit()]
+    return max(versions, default=0) + 1
+
+
+def merge_records(records, database_path: str = None, index_path: str = None,
+                  run_id: str = None, dry_run: bool = False):
+    """Append validated ``(category, record)`` pairs to the matching database sheets.
+
+    Records without a name, with an unknown category, or that duplicate a
+    dataset in the workbook's ``DuplicateIndex`` (the one updater runs dedupe
+    against) are rejected. The workbook is written to a temporary file and
+    swapped in with ``os.replace``, and each merge leaves a numbered JSON delta
+    next to the workbook. Returns the delta dict, or ``None`` if nothing was added.
+    """
+    database_path = database_path or _database_path()
+    index_path = index_path or default_index_path(database_path)
+    index = load_duplicate_index(database_path, index_path)
+    parent_hash = index.source_hash
+
+    wb = load_workbook(database_path)
+    added, rejected = {}, []
+    for category, record in records:
+        name = record.get("dataset_name")
+        if category not in wb.sheetnames:
+            rejected.append((name, f"unknown category {category!r}"))
+            continue
+        if not name or str(name).strip().lower() == "not specified":
+            rejected.append((name, "missing dataset name"))
+            continue
+        duplicate = index.find_duplicate(record)
+        if duplicate:
+            rejected.append((name, f"duplicate {duplicate}"))
+            continue
+        # Later records of this merge are checked against the accepted ones too.
+        index.add(record)
+        added.setdefault(category, []).append(record)
+
+    for name, reason in rejected:
+        print(f"♻️ Not merging {name}: {reason}")
+    if not added:
+        print("⚠️ Nothing to merge.")
+        return None
+
+    for category, rows in added.items():
+        ws = wb[category]
+        columns = {str(c.value).lower(): c.column for c in ws[1] if c.value}
+        row = _last_row(ws)
+        unmapped = set()
+        for record in rows:
+            row += 1
+            for field, value in record.items():
+                if field.lower() in RECORD_METADATA:
+                    continue
+                column = target_column(columns, field)
+                if column:
+                    ws.cell(row, column, value)
+                else:
+                    unmapped.add(field)
+        if unmapped:
+            print(f"⚠️ Sheet {category} has no column for {', '.join(sorted(unmapped))}; those values were not merged.")
+
+    delta = {
+        "run_id": run_id,
+        "created_at": datetime.now().isoformat(),
+        "parent_sha256": parent_hash,
+        "added": added,
+    }
+    if dry_run:
+        for category, rows in added.items():
+            print(f"🔍 Would add {len(rows)} dataset(s) to {category}.")
+        return delta
+
+    tmp = f"{database_path}.{os.getpid()}.tmp"
+    wb.save(tmp)
+    if _file_hash(database_path) != parent_hash:
+        os.remove(tmp)
+        raise RuntimeError("Database changed during merge; nothing was written.")
+    os.replace(tmp, database_path)
+
+    deltas_dir = _deltas_dir(database_path)
+    os.makedirs(deltas_dir, exist_ok=True)
+    delta["version"] = _next_version(deltas_dir)
+    delta["sha256"] = _file_hash(database_path)
+    with open(os.path.join(deltas_dir, f"{delta['version']:05d}.json"), "w", encoding="utf-8") as f:
+        json.dump(delta, f, ensure_ascii=False, indent=2)
+
+    index.source_hash = delta["sha256"]
+    index.save(index_path)
+
+    for category, rows in added.items():
+        print(f"✅ Added {len(rows)} dataset(s) to {category}.")
+    print(f"💾 Database version {delta['version']} written to {database_path}")
+    return delta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge an updater run into the NeuroAIHub database.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--run-id", help="run id from the updater journal (new records only)")
+    source.add_argument("--jsonl", help="new_datasets_*.jsonl written by an updater run")
+    parser.add_argument("--database", help="workbook to merge into (default: the bundled database)")
+    parser.add_argument("--journal", help="path of the updater journal")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.run_id:
+        records = list(records_from_journal(args.run_id, args.journal))
+    else:
+        records = list(records_from_jsonl(args.jsonl))
+    merge_records(records, args.database, run_id=args.run_id, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import io
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import PyPDF2
+
+PDF_MAGIC = b"%PDF-"
+
+
+def is_pdf(url: str, content_type: str = "", head: bytes = b"") -> bool:
+    """Detect PDFs from the Content-Type or magic bytes, falling back to the URL suffix."""
+    if head:
+        if head.lstrip()[:5] == PDF_MAGIC:
+            return True
+    if content_type and "application/pdf" in content_type.lower():
+        return True
+    return not head and not content_type and url.lower().split("?")[0].endswith(".pdf")
+
+
+def extract_pdf_text(content: bytes, max_pages: int = None, max_chars: int = None) -> str:
+    """Extract text page by page, stopping at ``max_pages`` or once ``max_chars`` are collected."""
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    parts, collected = [], 0
+    for i, page in enumerate(reader.pages):
+        if max_pages is not None and i >= max_pages:
+            break
+        text = page.extract_text()
+        if text:
+            parts.append(text)
+            collected += len(text)
+            if max_chars is not None and collected >= max_chars:
+                break
+    return "\n".join(parts)
+
+
+class PdfParserPool:
+    """Parses PDFs in worker processes so CPU-bound parsing does not hold the GIL.
+
+    A document that exceeds ``timeout`` seconds gets its worker processes
+    terminated and the pool recreated; other documents caught in the reset are
+    retried once on the fresh pool. Workers are started with ``forkserver`` (or
+    ``spawn`` where that is unavailable): the pool is created while fetch threads
+    run, and forking a multi-threaded process can deadlock the child.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 60):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._pool
+
+    def _reset(self, pool):
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def parse(self, content: bytes, max_pages: int = None, max_chars: int = None, timeout: float = None) -> str:
+        timeout = timeout or self.timeout
+        for attempt in range(2):
+            pool = self._get_pool()
+            future = pool.submit(extract_pdf_text, content, max_pages, max_chars)
+            try:
+                return future.result(timeout=timeout)
+            except TimeoutError:
+                self._reset(pool)
+                raise TimeoutError(f"PDF parsing exceeded {timeout}s")
+            except BrokenProcessPool:
+                self._reset(pool)
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> PdfParserPool:
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PdfParserPool()
+        return _default_pool
@@ -0,0 +1,209 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from neuroaihub.updater.query_generator import generate_search_queries
+from neuroaihub.updater.web_search import cached_search, get_search_cache
+from neuroaihub.updater.text_fetcher import fetch_text, FetchFailed
+from neuroaihub.updater.utils import split_text_tokens, get_token_counter
+from neuroaihub.updater.chunk_executor import extract_chunks
+from neuroaihub.updater.extractor import extract_dataset_info_batch
+from neuroaihub.updater.updater import save_new_datasets
+
+
+def bounded_map(func, items, max_workers: int = 4, window: int = None):
+    """Thread-pool ``map`` that pulls lazily from ``items`` and yields in order.
+
+    At most ``window`` calls are in flight, so a slow consumer throttles the
+    producer instead of letting results pile up in memory.
+    """
+    window = window or max_workers * 2
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def query_stage(categories):
+    for category in categories:
+        for query in generate_search_queries(category):
+            yield category, query
+
+
+def search_stage(queries, serper_api_key, tavily_api_key, num_results: int = 5,
+                 workers: int = 8, use_cache: bool = True, log=print):
+    cache = get_search_cache() if use_cache else None
+    api_keys = {"serper": serper_api_key, "tavily": tavily_api_key}
+    tasks = (
+        (category, query, provider)
+        for category, query in queries
+        for provider in ("serper", "tavily") if api_keys[provider]
+    )
+
+    def run(task):
+        category, query, provider = task
+        try:
+            results = cached_search(provider, query, api_keys[provider], num_results, cache)
+            log(f"✅ {provider.capitalize()} returned {len(results)} results for '{query}'.")
+        except Exception as e:
+            log(f"⚠️ {provider.capitalize()} search failed for '{query}': {e}")
+            results = []
+        return category, results
+
+    for category, results in bounded_map(run, tasks, workers):
+        for r in results:
+            yield category, r["url"]
+
+
+def dedupe_urls(items):
+    seen = set()
+    for category, url in items:
+        if (category, url) not in seen:
+            seen.add((category, url))
+            yield category, url
+
+
+def journal_urls(items, journal):
+    """Record searched URLs in the journal as they stream past."""
+    for category, url in items:
+        journal.add_urls(category, [url])
+        yield category, url
+    journal.mark_searched()
+
+
+def fetch_stage(items, journal=None, workers: int = 4, fetch_options: dict = None, log=print):
+    if journal is not None:
+        items = ((c, u) for c, u in items if not journal.is_done(c, u))
+
+    def run(item):
+        category, url = item
+        try:
+            return category, url, fetch_text(url, raise_transient=True, **(fetch_options or {}))
+        except FetchFailed:
+            return category, url, None
+
+    for category, url, text in bounded_map(run, items, workers):
+        if text is None:
+            log(f"⚠️ Fetching {url} failed; it is retried when the run is resumed.")
+            if journal is not None:
+                journal.mark_failed(category, url)
+            continue
+        log(f"\n🌐 Fetched: {url}")
+        if not text.strip():
+            log("⚠️ Empty or unreadable content, skipping.")
+            if journal is not None:
+                journal.mark_skipped(category, url)
+            continue
+        if journal is not None:
+            journal.mark_fetched(category, url)
+        yield category, url, text
+
+
+def relevance_stage(docs, scorer, journal=None, log=print):
+    for category, url, text in docs:
+        relevant, score = scorer.is_relevant(text)
+        if not relevant:
+            log(f"🚫 Skipping low-relevance page (score {score:.2f} < {scorer.threshold}): {url}")
+            if journal is not None:
+                journal.mark_skipped(category, url)
+            continue
+        yield category, url, text
+
+
+def chunk_stage(docs, model: str = None, max_tokens: int = 3000):
+    for category, url, text in docs:
+        yield category, url, split_text_tokens(text, model, max_tokens)
+
+
+def batch_stage(docs, model: str = None, batch_token_budget: int = 6000,
+                short_doc_tokens: int = 1500, max_docs: int = 8):
+    """Group single-chunk short documents into batches for one LLM call each.
+
+    Longer documents pass through as batches of one. A batch is emitted once
+    the next document would exceed ``batch_token_budget`` or ``max_docs``.
+    """
+    count_tokens = get_token_counter(model)
+    batch, used = [], 0
+    for doc in docs:
+        chunks = doc[2]
+        n = count_tokens(chunks[0]) if len(chunks) == 1 else None
+        if n is None or n > short_doc_tokens:
+            yield [doc]
+            continue
+        if batch and (used + n > batch_token_budget or len(batch) >= max_docs):
+            yield batch
+            batch, used = [], 0
+        batch.append(doc)
+        used += n
+    if batch:
+        yield batch
+
+
+def extract_stage(docs, llm, max_workers: int = 4, required_fields=None,
+                  journal=None, workers: int = 1, token_budget: int = None,
+                  batched: bool = False, log=print):
+    """Extract records from ``(category, url, chunks)`` docs, or from ``batch_stage`` output if ``batched``."""
+    def run(batch):
+        if len(batch) == 1:
+            category, url, chunks = batch[0]
+            return [(category, url, extract_chunks(chunks, llm, max_workers, required_fields, token_budget))]
+        log(f"📦 Extracting {len(batch)} short documents in one request.")
+        results = extract_dataset_info_batch(
+            [(f"doc{i}", chunks[0]) for i, (_, _, chunks) in enumerate(batch)], llm
+        )
+        return [(category, url, results[f"doc{i}"]) for i, (category, url, _) in enumerate(batch)]
+
+    batches = docs if batched else ([doc] for doc in docs)
+    for results in bounded_map(run, batches, workers):
+        for category, url, data in results:
+            if not data:
+                # Extraction only comes back empty when every LLM call failed.
+                log(f"⚠️ Extraction failed for {url}; it is retried when the run is resumed.")
+                if journal is not None:
+                    journal.mark_failed(category, url)
+                continue
+            data["Category"] = category
+            if journal is not None:
+                journal.save_record(category, url, data)
+            log("✅ Extracted dataset successfully.")
+            yield category, url, data
+
+
+def dedupe_stage(records, index, journal=None, log=print):
+    """Drop records that duplicate the database or an earlier record of this run."""
+    for category, url, data in records:
+        reason = index.find_duplicate(data)
+        if journal is not None:
+            journal.mark_deduped(category, url, reason is None)
+        if reason is None:
+            index.add(data)
+            yield category, url, data
+        else:
+            log(f"♻️ Skipping duplicate dataset {data.get('dataset_name', url)}: {reason}")
+
+
+class JsonlSink:
+    """Appends each validated record to a JSONL file as soon as it arrives."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def records(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def close(self, to_excel: bool = True):
+        self._file.close()
+        if to_excel and self.count:
+            return save_new_datasets(self.records())
+        return None
@@ -0,0 +1,171 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+import pandas as pd
+
+KEYWORD_WEIGHTS = {
+    r"\bdownload": 1.5,
+    r"\bdoi\b": 1.0,
+    r"\bsubjects?\b": 1.0,
+    r"\bparticipants?\b": 0.8,
+    r"\bpatients?\b": 0.5,
+    r"\bnifti\b": 2.0,
+    r"\bdicom\b": 2.0,
+    r"\bdatasets?\b": 1.0,
+    r"\bdata ?(set|base) (is|are) (publicly )?available": 2.0,
+    r"\bdata availability\b": 1.5,
+    r"\b(open|restricted|controlled)[ -]access\b": 1.5,
+    r"\blicen[cs]e\b": 0.8,
+    r"\bmri\b|\bct\b|\bpet\b|\bdwi\b|\bfmri\b": 1.0,
+    r"\bt1[- ]?weighted\b|\bt2[- ]?weighted\b|\bflair\b": 1.0,
+    r"\bsegmentation (masks?|labels?)\b|\bannotations?\b|\bground truth\b": 1.2,
+    r"\bvoxel\b|\bresolution\b|\bslice thickness\b": 0.8,
+    r"\bzenodo\b|\bfigshare\b|\bopenneuro\b|\btcia\b|\bsynapse\b|\bphysionet\b|\bkaggle\b|\bgrand-challenge\b": 2.0,
+    r"\bhealthy controls?\b": 0.8,
+}
+
+_compiled = [(re.compile(p, re.IGNORECASE), w) for p, w in KEYWORD_WEIGHTS.items()]
+_token_re = re.compile(r"[a-z][a-z0-9]+")
+MODEL_FORMAT = 1
+
+
+def keyword_score(text: str, max_hits: int = 5) -> float:
+    """Weighted keyword evidence squashed into [0, 1]."""
+    total = sum(w * min(len(p.findall(text)), max_hits) for p, w in _compiled)
+    return 1.0 - math.exp(-total / 10.0)
+
+
+def _tokens(text: str):
+    return _token_re.findall(text.lower())
+
+
+class TfidfCentroid:
+    """Cosine similarity to the TF-IDF centroid of the existing database entries."""
+
+    def __init__(self, documents=()):
+        self.source_hash = None
+        doc_freq = Counter()
+        tokenized = [_tokens(d) for d in documents]
+        for tokens in tokenized:
+            doc_freq.update(set(tokens))
+        n_docs = max(1, len(tokenized))
+        self.idf = {t: math.log((1 + n_docs) / (1 + df)) + 1.0 for t, df in doc_freq.items()}
+
+        centroid = Counter()
+        for tokens in tokenized:
+            for t, w in self._vector(tokens).items():
+                centroid[t] += w / n_docs
+        self._set_centroid(centroid)
+
+    def _set_centroid(self, centroid):
+        self.centroid = centroid
+        self.centroid_norm = math.sqrt(sum(v * v for v in centroid.values())) or 1.0
+
+    def save(self, path: str):
+        state = {"format": MODEL_FORMAT, "source_hash": self.source_hash,
+                 "idf": self.idf, "centroid": dict(self.centroid)}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported relevance model format {state.get('format')!r}.")
+        model = cls()
+        model.idf = state["idf"]
+        model._set_centroid(Counter(state["centroid"]))
+        model.source_hash = state["source_hash"]
+        return model
+
+    def _vector(self, tokens):
+        counts = Counter(t for t in tokens if t in self.idf)
+        vec = {t: (1 + math.log(c)) * self.idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    def similarity(self, text: str) -> float:
+        vec = self._vector(_tokens(text))
+        return sum(v * self.centroid.get(t, 0.0) for t, v in vec.items()) / self.centroid_norm
+
+
+def load_database_documents(database_path: str):
+    try:
+        excel_data = pd.read_excel(database_path, sheet_name=None)
+    except Exception as e:
+        print(f"⚠️ Could not load database for relevance model: {e}")
+        return []
+
+    documents = []
+    for df in excel_data.values():
+        for row in df.itertuples(index=False):
+            documents.append(" ".join(
+                str(v) for v in row if pd.notna(v) and str(v).strip() not in ("", "Not specified")
+            ))
+    return documents
+
+
+def load_relevance_model(database_path: str = None, model_path: str = None):
+    """The database's ``TfidfCentroid``, cached next to the duplicate index.
+
+    Like ``load_duplicate_index``, the cached model is rebuilt only when the
+    workbook's hash changes; ``None`` if the workbook cannot be read.
+    """
+    # Imported here because utils, which dedupe imports, imports this module.
+    from neuroaihub.updater.dedupe import _database_path, _file_hash, workbook_cache_path
+    try:
+        database_path = database_path or _database_path()
+        source_hash = _file_hash(database_path)
+    except Exception as e:
+        print(f"⚠️ Could not load database for relevance model: {e}")
+        return None
+    model_path = model_path or workbook_cache_path("relevance_model", database_path)
+    try:
+        model = TfidfCentroid.load(model_path)
+        if model.source_hash == source_hash:
+            return model
+    except Exception:
+        pass
+    documents = load_database_documents(database_path)
+    if not documents:
+        return None
+    model = TfidfCentroid(documents)
+    model.source_hash = source_hash
+    model.save(model_path)
+    return model
+
+
+class RelevanceScorer:
+    """Cheap, CPU-only estimate of whether a page describes a dataset.
+
+    Combines keyword evidence with similarity to the existing database entries.
+    Only pages scoring at or above ``threshold`` are worth an LLM extraction.
+    """
+
+    def __init__(self, threshold: float = 0.25, documents=None, keyword_weight: float = 0.7,
+                 max_chars: int = 50000):
+        self.threshold = threshold
+        self.keyword_weight = keyword_weight
+        self.max_chars = max_chars
+        if documents is None:
+            self.model = load_relevance_model()
+        else:
+            self.model = TfidfCentroid(documents) if documents else None
+
+    def score(self, text: str) -> float:
+        text = text[:self.max_chars]
+        kw = keyword_score(text)
+        if self.model is None:
+            return kw
+        # Raw centroid similarities are small; rescale so typical dataset pages land near 1.
+        sim = min(1.0, self.model.similarity(text) * 2.5)
+        return self.keyword_weight * kw + (1 - self.keyword_weight) * sim
+
+    def is_relevant(self, text: str):
+        score = self.score(text)
+        return score >= self.threshold, score
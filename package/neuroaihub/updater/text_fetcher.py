@@ -1,23 +1,296 @@
 import requests
-from bs4 import BeautifulSoup
-import io
-import PyPDF2
+from requests.adapters import HTTPAdapter
+import os
+import json
+import hashlib
+import threading
+from neuroaihub.updater.utils import get_cache_dir
+from neuroaihub.updater.pdf_parser import is_pdf, get_pdf_pool
+from neuroaihub.updater.html_extractor import html_to_text
 
-def fetch_text(url: str) -> str:
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+HTML_MAX_BYTES = 5 * 1024 * 1024
+ALLOWED_CONTENT_TYPES = (
+    "text/html", "application/xhtml+xml", "text/plain",
+    "application/pdf", "application/x-pdf", "application/octet-stream",
+)
+
+PDF_MAX_PAGES = 50
+PDF_MAX_BYTES = 30 * 1024 * 1024
+PDF_MAX_CHARS = 200_000
+PDF_TIMEOUT = 60
+# Bump when extraction changes so text parsed by older code is not served.
+TEXT_PARSER_VERSION = 2
+# Bodies and parsed text kept on disk; least recently used files are evicted beyond this.
+PAGE_CACHE_BYTES = int(os.environ.get("NEUROAIHUB_PAGE_CACHE_MB", 2048)) * 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size: int = 16) -> requests.Session:
+    """Shared keep-alive session reused by every fetch."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+    return _session
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path, data: bytes):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PageCache:
+    """On-disk cache of response bodies, their validators and the parsed text.
+
+    ``meta/<sha(url)>.json`` holds the ETag/Last-Modified headers and the hash of the
+    last body, ``body/<content hash>`` the raw bytes and ``text/<text key>.txt``
+    the extracted text, keyed by ``text_cache_key`` so identical content is
+    only parsed once per set of parse options. Bodies and texts share a budget of
+    ``max_bytes``; reads refresh a file's mtime, and once the budget is exceeded
+    the least recently used files are removed until 90% of it is left. A body
+    evicted under its meta file is simply downloaded again.
+    """
 
-        if url.lower().endswith(".pdf"):
-            reader = PyPDF2.PdfReader(io.BytesIO(resp.content))
-            text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
+    def __init__(self, cache_dir: str = None, max_bytes: int = PAGE_CACHE_BYTES):
+        self.root = os.path.join(cache_dir or get_cache_dir(), "pages")
+        for sub in ("meta", "body", "text"):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _files(self):
+        for sub in ("body", "text"):
+            with os.scandir(os.path.join(self.root, sub)) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_size, stat.st_mtime
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _added(self, nbytes: int):
+        """Account for ``nbytes`` just written and evict the oldest files if over budget."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._files())
+            else:
+                self._size += nbytes
+            if self._size <= self.max_bytes:
+                return
+            files = sorted(self._files(), key=lambda f: f[2])
+            total, evicted = sum(size for _, size, _ in files), 0
+            for path, size, _ in files:
+                if total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            self._size = total
+        print(f"🧹 Evicted {evicted} cached page file(s) to stay under {self.max_bytes // (1024 * 1024)} MB.")
+
+    def _meta_path(self, url):
+        return os.path.join(self.root, "meta", _sha256(url.encode("utf-8")) + ".json")
+
+    def get_meta(self, url):
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, body: bytes, headers) -> str:
+        content_hash = _sha256(body)
+        body_path = os.path.join(self.root, "body", content_hash)
+        if os.path.exists(body_path):
+            self._touch(body_path)
         else:
-            soup = BeautifulSoup(resp.text, "html.parser")
-            for tag in soup(["script", "style", "footer", "header", "nav"]):
-                tag.decompose()
-            text = " ".join(soup.stripped_strings)
+            _atomic_write(body_path, body)
+            self._added(len(body))
+        meta = {
+            "url": url,
+            "content_hash": content_hash,
+            "content_type": headers.get("Content-Type", ""),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        _atomic_write(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+        return content_hash
+
+    def get_body(self, content_hash):
+        path = os.path.join(self.root, "body", content_hash)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return body
+
+    def get_text(self, text_key):
+        path = os.path.join(self.root, "text", text_key + ".txt")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        self._touch(path)
         return text
+
+    def put_text(self, text_key, text: str):
+        data = text.encode("utf-8")
+        _atomic_write(os.path.join(self.root, "text", text_key + ".txt"), data)
+        self._added(len(data))
+
+
+_default_cache = None
+
+
+def get_page_cache() -> PageCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PageCache()
+    return _default_cache
+
+
+class SkippedContent(Exception):
+    pass
+
+
+class FetchFailed(Exception):
+    """A fetch that failed for a reason that may not recur: a timeout, 5xx or 429."""
+
+
+def download(session, url: str, headers: dict = None,
+             max_html_bytes: int = HTML_MAX_BYTES, max_pdf_bytes: int = PDF_MAX_BYTES):
+    """Stream a response body, enforcing content-type and size limits.
+
+    Returns ``(response, content)``; ``content`` is ``None`` for a 304. HTML bodies
+    are truncated at ``max_html_bytes``; PDFs over ``max_pdf_bytes`` are skipped,
+    since a truncated PDF cannot be parsed.
+    """
+    with session.get(url, headers=headers, timeout=15, stream=True) as resp:
+        if resp.status_code == 304:
+            return resp, None
+        resp.raise_for_status()
+
+        content_type = resp.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        if mime and mime not in ALLOWED_CONTENT_TYPES:
+            raise SkippedContent(f"unsupported content type {mime}")
+
+        declared = int(resp.headers.get("Content-Length") or 0)
+        buf, limit, pdf = bytearray(), None, False
+        for block in resp.iter_content(chunk_size=64 * 1024):
+            if limit is None:
+                pdf = is_pdf(url, content_type, block[:1024])
+                limit = max_pdf_bytes if pdf else max_html_bytes
+                if pdf and limit is not None and declared > limit:
+                    raise SkippedContent(f"PDF larger than {limit} bytes")
+            buf += block
+            if limit is not None and len(buf) > limit:
+                if pdf:
+                    raise SkippedContent(f"PDF larger than {limit} bytes")
+                del buf[limit:]
+                print(f"✂️ Truncated {url} at {limit} bytes.")
+                break
+        return resp, bytes(buf)
+
+
+def parse_content(url: str, content: bytes, content_type: str = "",
+                  max_pdf_pages: int = PDF_MAX_PAGES, max_pdf_chars: int = PDF_MAX_CHARS,
+                  pdf_timeout: float = PDF_TIMEOUT, main_content: bool = True) -> str:
+    if is_pdf(url, content_type, content[:1024]):
+        return get_pdf_pool().parse(content, max_pdf_pages, max_pdf_chars, pdf_timeout)
+    return html_to_text(content, main_content=main_content)
+
+
+def text_cache_key(content_hash: str, max_pdf_pages: int = PDF_MAX_PAGES, max_pdf_chars: int = PDF_MAX_CHARS,
+                   pdf_timeout: float = PDF_TIMEOUT, main_content: bool = True) -> str:
+    """Cache key of the text parsed from ``content_hash`` with these ``parse_content`` options."""
+    options = [TEXT_PARSER_VERSION, max_pdf_pages, max_pdf_chars, pdf_timeout, main_content]
+    return _sha256(f"{content_hash}:{json.dumps(options)}".encode("utf-8"))
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status in (408, 429)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def fetch_text(url: str, use_cache: bool = True,
+               max_html_bytes: int = HTML_MAX_BYTES, max_pdf_bytes: int = PDF_MAX_BYTES,
+               raise_transient: bool = False, **parse_options) -> str:
+    """Text of ``url``, or ``""`` if it cannot be read.
+
+    With ``raise_transient``, failures worth retrying later raise ``FetchFailed``
+    instead, so callers can tell them from empty or skipped content.
+    """
+    try:
+        session = get_session()
+        cache = get_page_cache() if use_cache else None
+        meta = cache.get_meta(url) if cache else None
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp, content = download(session, url, headers, max_html_bytes, max_pdf_bytes)
+
+        content_type = resp.headers.get("Content-Type", "")
+        if content is None and meta:
+            content_hash = meta["content_hash"]
+            content_type = meta.get("content_type", "")
+            text = cache.get_text(text_cache_key(content_hash, **parse_options))
+            if text is not None:
+                return text
+            content = cache.get_body(content_hash)
+            if content is None:
+                resp, content = download(session, url, None, max_html_bytes, max_pdf_bytes)
+                content_type = resp.headers.get("Content-Type", "")
+        if resp.status_code != 304:
+            content_hash = cache.put(url, content, resp.headers) if cache else None
+            if cache:
+                text = cache.get_text(text_cache_key(content_hash, **parse_options))
+                if text is not None:
+                    return text
+
+        text = parse_content(url, content or b"", content_type, **parse_options)
+        if cache and text.strip():
+            # Empty text (skipped or unreadable content) is re-parsed next time instead of cached.
+            cache.put_text(text_cache_key(content_hash, **parse_options), text)
+        return text
+    except SkippedContent as e:
+        print(f"⚠️ Skipping {url}: {e}")
+        return ""
     except Exception as e:
         print(f"⚠️ Failed to fetch {url}: {e}")
+        if raise_transient and _is_transient(e):
+            raise FetchFailed(str(e)) from e
         return ""
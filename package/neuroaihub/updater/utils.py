@@ -1,4 +1,7 @@
+import os
 import re
+import functools
+from neuroaihub.updater.relevance import keyword_score
 
 def split_text(text: str, max_words: int = 3000, overlap_sentences: int = 1):
     text = re.sub(r"\s+", " ", text.strip())
@@ -28,6 +31,95 @@ def split_text(text: str, max_words: int = 3000, overlap_sentences: int = 1):
     return chunks
 
 
+@functools.lru_cache(maxsize=None)
+def get_token_counter(model: str = None):
+    """Return a ``text -> token count`` function for ``model``.
+
+    Uses tiktoken when it is installed and the encoding can be loaded, otherwise
+    falls back to the usual ~4 characters per token estimate.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode_ordinary(text))
+    except Exception:
+        return lambda text: (len(text) + 3) // 4
+
+
+def split_text_tokens(text: str, model: str = None, max_tokens: int = 3000, overlap_sentences: int = 1):
+    """Split ``text`` into chunks of at most ``max_tokens`` tokens in a single pass.
+
+    Every sentence is tokenized exactly once; the running total of the current
+    chunk, including the carried-over overlap, is kept incrementally.
+    """
+    count_tokens = get_token_counter(model)
+    text = re.sub(r"\s+", " ", text.strip())
+    if not text:
+        return []
+    sentences = re.split(r'(?<=[.!?;:])\s+', text)
+
+    chunks, current, current_tokens = [], [], []
+    total = 0
+
+    for s in sentences:
+        n = count_tokens(s)
+
+        if n > max_tokens:
+            # Flush first so the pieces keep their place in the document; no overlap spans them.
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens, total = [], [], 0
+            words = s.split()
+            step = max(1, int(len(words) * max_tokens / n))
+            chunks.extend(" ".join(words[j:j + step]) for j in range(0, len(words), step))
+            continue
+
+        if total + n > max_tokens and current:
+            chunks.append(" ".join(current))
+            keep = overlap_sentences if overlap_sentences > 0 else 0
+            current = current[len(current) - keep:] if keep else []
+            current_tokens = current_tokens[len(current_tokens) - keep:] if keep else []
+            total = sum(current_tokens)
+            while current and total + n > max_tokens:
+                total -= current_tokens.pop(0)
+                current.pop(0)
+
+        current.append(s)
+        current_tokens.append(n)
+        total += n
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+METADATA_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"\b\d[\d,]*\s+(subjects|participants|patients|cases|scans|volumes)\b",
+        r"\b(aged?|age range|years old)\b",
+        r"\b(modalit(y|ies)|mri|ct|pet|t1|t2|flair|dwi|dti)\b",
+        r"\b(access|available|request|registration|data use agreement|download)\b",
+        r"\b(10\.\d{4,9}/\S+|doi)\b",
+        r"\b(nifti|dicom|nii|mha|bids)\b",
+        r"\b(institution|university|hospital|consortium)\b",
+    )
+]
+
+
+def chunk_metadata_score(chunk: str) -> float:
+    sections = sum(1 for p in METADATA_PATTERNS if p.search(chunk))
+    return sections + keyword_score(chunk)
+
+
+def rank_chunks(chunks):
+    """Chunk indices ordered by how much dataset metadata they are likely to hold."""
+    scores = [chunk_metadata_score(c) for c in chunks]
+    return sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+
+
 def aggregate_chunk_results(chunk_results):
     
     if not chunk_results:
@@ -46,3 +138,11 @@ def aggregate_chunk_results(chunk_results):
             aggregated[key] = "Not specified"
 
     return aggregated
+
+
+def get_cache_dir():
+    cache_dir = os.environ.get("NEUROAIHUB_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "neuroaihub"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
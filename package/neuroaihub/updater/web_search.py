@@ -1,22 +1,109 @@
-import requests
 import pandas as pd
 from tavily import TavilyClient
+import os
+import json
 import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from neuroaihub.updater.text_fetcher import get_session
+from neuroaihub.updater.utils import get_cache_dir
 
-def serper_search(query: str, api_key: str, num_results: int = 5) -> pd.DataFrame:
-    url = "https://google.serper.dev/search"
+SERPER_URL = os.environ.get("NEUROAIHUB_SERPER_URL", "https://google.serper.dev/search")
+TAVILY_URL = os.environ.get("NEUROAIHUB_TAVILY_URL", "https://api.tavily.com")
+
+_tavily_clients = {}
+_tavily_lock = threading.Lock()
+
+
+def get_tavily_client(api_key: str, base_url: str = None) -> TavilyClient:
+    key = (api_key, base_url or TAVILY_URL)
+    with _tavily_lock:
+        if key not in _tavily_clients:
+            _tavily_clients[key] = TavilyClient(api_key=api_key, base_url=key[1])
+        return _tavily_clients[key]
+
+
+class SearchCache:
+    """On-disk cache of search results keyed by (provider, query, num_results)."""
+
+    def __init__(self, cache_dir: str = None, ttl: float = 24 * 3600):
+        self.root = os.path.join(cache_dir or get_cache_dir(), "search")
+        self.ttl = ttl
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, provider, query, num_results):
+        key = json.dumps([provider, query.strip().lower(), num_results])
+        return os.path.join(self.root, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, provider, query, num_results):
+        try:
+            with open(self._path(provider, query, num_results), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("timestamp", 0) > self.ttl:
+            return None
+        return entry.get("results")
+
+    def put(self, provider, query, num_results, results):
+        path = self._path(provider, query, num_results)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.time(), "results": results}, f)
+        os.replace(tmp, path)
+
+
+_default_cache = None
+
+
+def get_search_cache() -> SearchCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SearchCache()
+    return _default_cache
+
+
+def serper_results(query: str, api_key: str, num_results: int = 5, base_url: str = None) -> list:
     headers = {'X-API-KEY': api_key, 'Content-Type': 'application/json'}
     payload = {"q": query, "num": num_results}
+    response = get_session().post(base_url or SERPER_URL, headers=headers, json=payload, timeout=15)
+    response.raise_for_status()
+    results = response.json().get("organic", [])
+    return [
+        {"title": r.get("title"), "url": r.get("link"), "source": "serper"}
+        for r in results if r.get("link")
+    ]
+
+
+def tavily_results(query: str, api_key: str, max_results: int = 5, base_url: str = None) -> list:
+    response = get_tavily_client(api_key, base_url).search(query, max_results=max_results)
+    results = response.get("results", [])
+    return [
+        {"title": r.get("title"), "url": r.get("url"), "source": "tavily"}
+        for r in results if r.get("url")
+    ]
 
+
+PROVIDERS = {"serper": serper_results, "tavily": tavily_results}
+
+
+def cached_search(provider: str, query: str, api_key: str, num_results: int = 5,
+                  cache: SearchCache = None, base_url: str = None) -> list:
+    if cache is not None:
+        results = cache.get(provider, query, num_results)
+        if results is not None:
+            return results
+    results = PROVIDERS[provider](query, api_key, num_results, base_url=base_url)
+    if cache is not None:
+        cache.put(provider, query, num_results, results)
+    return results
+
+
+def serper_search(query: str, api_key: str, num_results: int = 5) -> pd.DataFrame:
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
-        response.raise_for_status()
-        results = response.json().get("organic", [])
-        data = [
-            {"Title": r.get("title"), "URL": r.get("link"), "Source": "Serper"}
-            for r in results if r.get("link")
-        ]
-        return pd.DataFrame(data)
+        data = serper_results(query, api_key, num_results)
+        return pd.DataFrame([{"Title": r["title"], "URL": r["url"], "Source": "Serper"} for r in data])
     except Exception as e:
         print(f"⚠️ Serper search failed: {e}")
         return pd.DataFrame(columns=["Title", "URL", "Source"])
@@ -24,49 +111,53 @@ def serper_search(query: str, api_key: str, num_results: int = 5) -> pd.DataFram
 
 def tavily_search(query: str, api_key: str, max_results: int = 5) -> pd.DataFrame:
     try:
-        client = TavilyClient(api_key=api_key)
-        response = client.search(query, max_results=max_results)
-        results = response.get("results", [])
-        data = [
-            {"Title": r.get("title"), "URL": r.get("url"), "Source": "Tavily"}
-            for r in results if r.get("url")
-        ]
-        return pd.DataFrame(data)
+        data = tavily_results(query, api_key, max_results)
+        return pd.DataFrame([{"Title": r["title"], "URL": r["url"], "Source": "Tavily"} for r in data])
     except Exception as e:
         print(f"⚠️ Tavily search failed: {e}")
         return pd.DataFrame(columns=["Title", "URL", "Source"])
 
 
-def combined_search(query: str, serper_api_key: str, tavily_api_key: str) -> pd.DataFrame:
-    
-    all_results = []
+def search_all(queries, serper_api_key: str, tavily_api_key: str, num_results: int = 5,
+               max_workers: int = 8, use_cache: bool = True,
+               serper_url: str = None, tavily_url: str = None) -> pd.DataFrame:
+    """Query Serper and Tavily concurrently for every query.
 
-    try:
-        serper_results = serper_search(query, serper_api_key, num_results=5)
-        if not serper_results.empty:
-            serper_results["source"] = "serper"
-            all_results.append(serper_results)
-            print(f"✅ Serper returned {len(serper_results)} results.")
-    except Exception as e:
-        print(f"⚠️ Serper search failed: {e}")
+    Returns one row per (query, url) with ``title``, ``url``, ``source`` and ``query``
+    columns; duplicates across providers for the same query are dropped.
+    """
+    cache = get_search_cache() if use_cache else None
+    api_keys = {"serper": serper_api_key, "tavily": tavily_api_key}
+    base_urls = {"serper": serper_url, "tavily": tavily_url}
+    tasks = [(provider, q) for q in queries for provider in ("serper", "tavily") if api_keys[provider]]
 
-    try:
-        tavily_results = tavily_search(query, tavily_api_key, max_results=5)
-        if not tavily_results.empty:
-            tavily_results["source"] = "tavily"
-            all_results.append(tavily_results)
-            print(f"✅ Tavily returned {len(tavily_results)} results.")
-    except Exception as e:
-        print(f"⚠️ Tavily search failed: {e}")
+    def run(task):
+        provider, q = task
+        try:
+            results = cached_search(provider, q, api_keys[provider], num_results, cache, base_urls[provider])
+            print(f"✅ {provider.capitalize()} returned {len(results)} results for '{q}'.")
+            return [dict(r, query=q) for r in results]
+        except Exception as e:
+            print(f"⚠️ {provider.capitalize()} search failed for '{q}': {e}")
+            return []
+
+    rows, seen = [], set()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for results in pool.map(run, tasks):
+            for r in results:
+                if (r["query"], r["url"]) not in seen:
+                    seen.add((r["query"], r["url"]))
+                    rows.append(r)
 
-    if not all_results:
+    return pd.DataFrame(rows, columns=["title", "url", "source", "query"])
+
+
+def combined_search(query: str, serper_api_key: str, tavily_api_key: str) -> pd.DataFrame:
+    combined = search_all([query], serper_api_key, tavily_api_key, max_workers=2)
+    if combined.empty:
         print("⚠️ No results found.")
         return pd.DataFrame()
 
-    combined = pd.concat(all_results, ignore_index=True)
-    combined.columns = [c.lower() for c in combined.columns]
-
-    if "url" in combined.columns:
-        combined.drop_duplicates(subset=["url"], inplace=True)
+    combined = combined.drop(columns=["query"])
     print(f"🔗 Combined {len(combined)} unique URLs.")
-    return combined
\ No newline at end of file
+    return combined
@@ -0,0 +1,148 @@
+import re
+import sys
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+import pandas as pd
+
+# Turns that refer to earlier answers depend on the conversation, not just the query.
+CONVERSATION_CUES = re.compile(
+    r"\b(these|those|them|they|their|the above|above|previous|earlier|same|it|its|that one|this one|"
+    r"more|again|instead|also|too|else|other ones?|last (one|results?|answer))\b",
+    re.IGNORECASE,
+)
+FOLLOW_UP_OPENERS = re.compile(
+    r"^\s*(and|but|or|so|now|then|only|just|what about|how about|filter( (to|by))?|sort( by)?|"
+    r"show me the (first|last|top))\b",
+    re.IGNORECASE,
+)
+FILLER = re.compile(
+    r"^(please |can you |could you |would you |i want you to |i'd like you to |hey |hi |neuroai )+"
+)
+FAILED_ANSWERS = ("I encountered an issue.", "I'm sorry, I encountered an issue.")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased query without punctuation, politeness prefixes or repeated whitespace."""
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    text = re.sub(r"[^\w\s.'-]", " ", text)
+    text = re.sub(r"[.'-](\s|$)", r"\1", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return FILLER.sub("", text).strip()
+
+
+def is_conversation_dependent(query: str) -> bool:
+    return bool(CONVERSATION_CUES.search(query or "") or FOLLOW_UP_OPENERS.search(query or ""))
+
+
+def conversation_digest(memory_variables: dict):
+    """Digest of the earlier turns and last results a query can refer to; ``None`` for a fresh conversation."""
+    history = memory_variables.get("chat_history") or []
+    results = memory_variables.get("last_found_datasets")
+    if results == "None":
+        results = None
+    if not history and results is None:
+        return None
+    if not isinstance(history, str):
+        history = [(getattr(m, "type", ""), getattr(m, "content", str(m))) for m in history]
+    return hashlib.sha1(repr((history, results)).encode("utf-8")).hexdigest()[:16]
+
+
+def is_cacheable_answer(output: str) -> bool:
+    return bool(output) and output not in FAILED_ANSWERS and not output.startswith("Agent stopped")
+
+
+def _size(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+class AnswerCache:
+    """Thread-safe LRU of final chat answers, shared by every session in the process.
+
+    Entries are keyed by the normalized query, the context the answer depends on
+    (model, endpoint and the ``conversation_digest`` of earlier turns and
+    results) and the registry version, so a data reload never serves stale
+    answers and a follow-up is only reused within an identical conversation. Values are dicts of text, tables and
+    images; tables are copied on the way in and out.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, data_version=None, context=None):
+        if is_conversation_dependent(query):
+            return None
+        context_hash = hashlib.sha1(repr(context).encode("utf-8")).hexdigest()[:16] if context is not None else None
+        return normalize_query(query), context_hash, data_version
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return {name: _copy(value) for name, value in entry.items()}
+
+    def put(self, key, answer: dict):
+        if key is None:
+            return
+        entry = {name: _copy(value) for name, value in answer.items()}
+        size = sum(_size(value) for value in entry.values())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AnswerCache()
+        return _default_cache
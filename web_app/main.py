@@ -2,16 +2,20 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
 import base64
 import json
-from data_utils import load_data
-from ui_utils import display_paginated_dataframe, get_unique_options_from_column
+from data_utils import load_registry
+from ui_utils import display_paginated_dataframe, top_with_others, download_buttons, export_columns, displaying_columns, display_full_output
+from repl_output import get_result_store
 from agent_setup import setup_agent
 from memory_utils import DatasetAwareMemory
+from profiler import RerunProfiler, tracked
+from router import IntentRouter, dataset_name_pattern
+from answer_cache import get_answer_cache, is_cacheable_answer, conversation_digest
 
 
 st.set_page_config(page_title="NeuroAI Hub", page_icon="🧠", layout="wide")
+profiler = RerunProfiler()
 
 st.markdown("""
 <style>
@@ -45,10 +49,16 @@ st.sidebar.markdown("""
 - 💻 [NeuroAIHub GitHub Repository](https://github.com/NeuroAIHub-Registry/NeuroAIHub)
 """)
 
-dataframes, combined_df, sheet_names = load_data()
+# Pin one registry version for the whole rerun; a reload only affects later reruns.
+with profiler.section("load_registry", cache="load_registry"):
+    snapshot = load_registry().current()
+dataframes, combined_df, sheet_names = snapshot.dataframes, snapshot.combined_df, snapshot.sheet_names
+store = snapshot.store
+answer_cache = get_answer_cache()
 
 if llm:
-    agent_executor = setup_agent(llm, combined_df, dataframes, sheet_names, user_api_key, user_base_url, user_model)
+    with profiler.section("setup_agent", cache="setup_agent"):
+        agent_executor = setup_agent(llm, combined_df, dataframes, sheet_names, user_api_key, user_base_url, user_model, _store=store, data_version=snapshot.version)
 
 st.title("🧠 NeuroAI Hub")
 st.markdown("Welcome! I'm **NeuroAI**, your assistant for exploring neuroradiology datasets.")
@@ -72,29 +82,36 @@ with st.expander("📊 **Browse a Category**"):
         if 'browse_table' in st.session_state: st.session_state.browse_table = 1 # Reset pagination
 
 if 'browse_df' in st.session_state and st.session_state.browse_df is not None:
-    st.markdown(f"### Datasets in the {st.session_state.browse_category_name} Category:")
-    display_paginated_dataframe(st.session_state.browse_df, state_key="browse_table")
+    with profiler.section("browse_table"):
+        st.markdown(f"### Datasets in the {st.session_state.browse_category_name} Category:")
+        display_paginated_dataframe(st.session_state.browse_df, state_key="browse_table")
+        browse_category = st.session_state.browse_category_name
+        # The download runs on a later click; pin the registry version current then, not this rerun's store.
+        download_buttons(
+            lambda: load_registry().current().store.iter_query(category=browse_category, columns=displaying_columns),
+            f"neuroaihub_{browse_category.lower()}", "browse_download", displaying_columns,
+        )
 
 
 with st.expander("🔍 **Find Specific Datasets**"):
-    with st.form("find_form"):
+    with st.form("find_form"), profiler.section("find_form"):
         st.write("Select your filters. Leave fields blank to ignore them.")
         c1, c2 = st.columns(2)
         with c1:
             sel_category = st.selectbox("Category:", options=["Any"] + sheet_names)
             disease_opt_col = 'disease_clean' if 'disease_clean' in combined_df.columns else 'disease'
             modality_opt_col = 'modality_clean' if 'modality_clean' in combined_df.columns else 'modality'
-            sel_disease = st.multiselect("Disease(s):", options=get_unique_options_from_column(combined_df[disease_opt_col]))
-            sel_modality = st.multiselect("Modality(s):", options=get_unique_options_from_column(combined_df[modality_opt_col]))
+            sel_disease = st.multiselect("Disease(s):", options=snapshot.options(disease_opt_col))
+            sel_modality = st.multiselect("Modality(s):", options=snapshot.options(modality_opt_col))
         with c2:
             access_opt_col = 'access_type_clean' if 'access_type_clean' in combined_df.columns else 'access_type'
             segmask_opt_col = 'segmentation_mask_clean' if 'segmentation_mask_clean' in combined_df.columns else 'segmentation_mask'
-            sel_access = st.selectbox("Access Type:", options=["Any"] + get_unique_options_from_column(combined_df[access_opt_col]) if access_opt_col in combined_df else ["Any", "Open", "Restricted"])
-            seg_mask_options = get_unique_options_from_column(combined_df[segmask_opt_col]) if segmask_opt_col in combined_df else []
+            sel_access = st.selectbox("Access Type:", options=["Any"] + snapshot.options(access_opt_col) if access_opt_col in combined_df else ["Any", "Open", "Restricted"])
+            seg_mask_options = snapshot.options(segmask_opt_col) if segmask_opt_col in combined_df else []
             sel_seg_mask = st.selectbox("Segmentation Mask:", options=["Any"] + seg_mask_options)
-            year_col = "year_clean" if "year_clean" in combined_df.columns else "year"
-            years = pd.to_numeric(combined_df[year_col].replace(["Not specified", "nan", "None", ""], pd.NA), errors="coerce").dropna()
-            min_year_val, max_year_val = (int(years.min()), int(years.max())) if not years.empty else (2000, 2025)
+            with profiler.section("year_range", cache="year_range"):
+                min_year, max_year = snapshot.cached('year_range', tracked("year_range", store.year_range))
+            min_year_val, max_year_val = (int(min_year), int(max_year)) if min_year is not None else (2000, 2025)
             sel_year_range = st.slider("Year Range:", min_value=min_year_val, max_value=max_year_val, value=(min_year_val, max_year_val))
 
         submitted = st.form_submit_button("Search Datasets")
@@ -102,35 +119,26 @@ with st.expander("🔍 **Find Specific Datasets**"):
     if 'find_results' not in st.session_state: st.session_state.find_results = None
 
     if submitted:
-        with st.spinner("Filtering data..."):
-            results_df = combined_df.copy()
-            if sel_category != "Any": results_df = results_df[results_df['category'] == sel_category]
-
-            disease_col = disease_opt_col
-            modality_col = modality_opt_col
-            access_col = access_opt_col
-            segmask_col = segmask_opt_col
-
-            if sel_disease and disease_col in results_df.columns:
-                pattern = '|'.join([re.escape(d) for d in sel_disease])
-                results_df = results_df[results_df[disease_col].astype(str).str.contains(pattern, na=False, case=False)]
-            if sel_modality and modality_col in results_df.columns:
-                pattern = '|'.join([re.escape(m) for m in sel_modality])
-                results_df = results_df[results_df[modality_col].astype(str).str.contains(pattern, na=False, case=False)]
-            if sel_access != "Any" and access_col in results_df.columns:
-                results_df = results_df[results_df[access_col].astype(str).str.fullmatch(re.escape(sel_access), case=False, na=False)]
-            if sel_seg_mask != "Any" and segmask_col in results_df.columns:
-                results_df = results_df[results_df[segmask_col].astype(str).str.contains(re.escape(sel_seg_mask), na=False, case=False)]
-
-            if 'year_clean' in results_df.columns:
-                results_df = results_df[(results_df['year_clean'] >= sel_year_range[0]) & (results_df['year_clean'] <= sel_year_range[1])]
+        with st.spinner("Filtering data..."), profiler.section("find_query"):
+            contains = {disease_opt_col: sel_disease, modality_opt_col: sel_modality}
+            if sel_seg_mask != "Any":
+                contains[segmask_opt_col] = [sel_seg_mask]
+            results_df = store.query(
+                category=None if sel_category == "Any" else sel_category,
+                contains={col: values for col, values in contains.items() if values},
+                equals={access_opt_col: sel_access} if sel_access != "Any" else None,
+                ranges={"year_clean": [(">=", sel_year_range[0]), ("<=", sel_year_range[1])]},
+            )
             st.session_state.find_results = results_df
             if 'find_table' in st.session_state: st.session_state.find_table = 1
 
     if st.session_state.find_results is not None:
-        st.markdown(f"### Found {len(st.session_state.find_results)} dataset(s)")
-        if not st.session_state.find_results.empty:
-            display_paginated_dataframe(st.session_state.find_results, state_key="find_table")
+        with profiler.section("find_table"):
+            st.markdown(f"### Found {len(st.session_state.find_results)} dataset(s)")
+            if not st.session_state.find_results.empty:
+                display_paginated_dataframe(st.session_state.find_results, state_key="find_table")
+                find_results = st.session_state.find_results
+                download_buttons(lambda: find_results, "neuroaihub_search_results", "find_download", export_columns(find_results))
 
 
 with st.expander("📈 **Create a Quick Plot**"):
@@ -151,24 +159,13 @@ with st.expander("📈 **Create a Quick Plot**"):
         plot_column = st.selectbox("Data to Plot:", options=list(plot_data_options.keys()))
 
     if st.button("Generate Plot"):
-        with st.spinner("Generating plot..."):
-            df_for_plot = combined_df
-            if plot_category != "All Categories":
-                df_for_plot = combined_df[combined_df['category'] == plot_category]
-
+        with st.spinner("Generating plot..."), profiler.section("quick_plot"):
             column_to_plot = plot_data_options[plot_column]
-            full_series = df_for_plot[column_to_plot].dropna().astype(str).str.split(',').explode().str.strip()
-            full_series = full_series[~full_series.str.lower().isin(['', 'nan', 'not specified'])].value_counts()
-
-            if len(full_series) > 5:
-                plot_series = full_series.nlargest(5)
-                others_sum = full_series.iloc[5:].sum()
-                if others_sum > 0:
-                    plot_series = pd.concat([plot_series, pd.Series([others_sum], index=['Others'])])
-            else:
-                plot_series = full_series
+            plot_filter = None if plot_category == "All Categories" else plot_category
+            with profiler.section("plot_counts", cache="plot_counts"):
+                full_series = snapshot.cached(('plot', column_to_plot, plot_filter), tracked("plot_counts", lambda: store.facet_counts(column_to_plot, plot_filter)))
 
-            plot_series = plot_series.sort_values(ascending=False)
+            plot_series = top_with_others(full_series, top=5)
 
             fig, ax = plt.subplots(figsize=(10, 6))
             if "Bar" in plot_chart_type:
@@ -195,14 +192,23 @@ if "messages" not in st.session_state:
 if "memory" not in st.session_state:
     st.session_state.memory = DatasetAwareMemory(k=5, memory_key="chat_history", return_messages=True)
 
-for i, msg in enumerate(st.session_state.messages):
-    with st.chat_message(msg["role"]):
-        if "content" in msg and msg["content"]:
-            st.markdown(msg["content"])
-        if "image_b64" in msg and msg["image_b64"]:
-            st.image(base64.b64decode(msg["image_b64"]))
-        if "table" in msg and msg["table"] is not None and not msg["table"].empty:
-            display_paginated_dataframe(msg["table"], state_key=f"page_agent_{i}")
+with profiler.section("chat_history"):
+    for i, msg in enumerate(st.session_state.messages):
+        with st.chat_message(msg["role"]):
+            if "content" in msg and msg["content"]:
+                st.markdown(msg["content"])
+            if "image_b64" in msg and msg["image_b64"]:
+                profiler.count("history_images")
+                st.image(base64.b64decode(msg["image_b64"]))
+            if "table" in msg and msg["table"] is not None and not msg["table"].empty:
+                profiler.count("history_tables")
+                with profiler.section("chat_history_tables"):
+                    display_paginated_dataframe(msg["table"], state_key=f"page_agent_{i}")
+                    table = msg["table"]
+                    download_buttons(lambda table=table: table, f"neuroaihub_answer_{i}", f"agent_download_{i}", export_columns(table))
+            if msg.get("full_output") is not None:
+                display_full_output(msg["full_output"], f"history_{i}")
+profiler.count("history_messages", len(st.session_state.messages))
 
 if not llm or not agent_executor:
     st.info("🧠 Enter your API details in the sidebar to enable the AI chat assistant.")
@@ -212,45 +218,70 @@ else:
         with st.chat_message("user"):
             st.markdown(user_query)
         with st.chat_message("assistant"):
-            with st.spinner("🧠 Thinking..."):
+            with st.spinner("🧠 Thinking..."), profiler.section("agent_turn"):
                 try:
-                    inputs = {"input": user_query, "chat_history": st.session_state.memory.load_memory_variables({})['chat_history']}
-                    response = agent_executor.invoke(inputs)
-                    final_answer = response.get('output', "I'm sorry, I encountered an issue.")
-
-                    assistant_message = {"role": "assistant", "content": final_answer, "table": None, "image_b64": None}
-
-                    if 'intermediate_steps' in response and response['intermediate_steps']:
-                        last_action, last_tool_outputervation = response['intermediate_steps'][-1]
-                        try:
-                            tool_output = json.loads(last_tool_outputervation)
-                            if 'data' in tool_output and tool_output['data']:
-                                df = pd.DataFrame(tool_output['data'])
-                                if not st.session_state.get("last_found_datasets") is df:
-                                    assistant_message["table"] = df
-                                    st.session_state["last_found_datasets"] = df
-                                    st.session_state.memory.save_datasets(df)
-                                assistant_message["content"] = final_answer.strip()
-
-                            elif 'image' in tool_output and tool_output['image']:
-                                assistant_message["image_b64"] = tool_output['image']
-                                text_part = tool_output.get('text', '')
-                                combined_text = final_answer.strip()
-                                if text_part and text_part not in combined_text:
-                                    combined_text += "\n\n" + text_part
-                                assistant_message["content"] = combined_text
-
-                            elif 'text' in tool_output:
-                                assistant_message["content"] = tool_output['text']
-                        except (json.JSONDecodeError, TypeError):
-                            assistant_message["content"] = final_answer
+                    memory_variables = st.session_state.memory.load_memory_variables({})
+                    inputs = {"input": user_query, "chat_history": memory_variables['chat_history']}
+                    cache_context = (user_base_url.strip(), user_model.strip(), conversation_digest(memory_variables))
+                    cache_key = answer_cache.key(user_query, snapshot.version, cache_context)
+                    cached = answer_cache.get(cache_key)
+                    if cached is not None:
+                        profiler.count("answer_cache_hits")
+                        final_answer = cached.pop("output")
+                        assistant_message = cached
+                        if assistant_message["table"] is not None:
+                            st.session_state["last_found_datasets"] = assistant_message["table"]
+                            st.session_state.memory.save_datasets(assistant_message["table"])
+                    else:
+                        # The name regex covers the whole registry; build it once per version, not per turn.
+                        name_pattern = snapshot.cached("dataset_name_pattern", lambda: dataset_name_pattern(combined_df["dataset_name"]))
+                        router = IntentRouter(agent_executor, columns=combined_df.columns, dataset_names=name_pattern)
+                        response = router.invoke(inputs)
+                        final_answer = response.get('output', "I'm sorry, I encountered an issue.")
+
+                        assistant_message = {"role": "assistant", "content": final_answer, "table": None, "image_b64": None, "full_output": None}
+
+                        if 'intermediate_steps' in response and response['intermediate_steps']:
+                            last_action, last_tool_outputervation = response['intermediate_steps'][-1]
+                            try:
+                                tool_output = json.loads(last_tool_outputervation)
+                                if tool_output.get('result_id'):
+                                    assistant_message["full_output"] = get_result_store().get(tool_output['result_id'])
+                                if 'data' in tool_output and tool_output['data']:
+                                    df = pd.DataFrame(tool_output['data'])
+                                    if not st.session_state.get("last_found_datasets") is df:
+                                        assistant_message["table"] = df
+                                        st.session_state["last_found_datasets"] = df
+                                        st.session_state.memory.save_datasets(df)
+                                    assistant_message["content"] = final_answer.strip()
+
+                                elif 'image' in tool_output and tool_output['image']:
+                                    assistant_message["image_b64"] = tool_output['image']
+                                    text_part = tool_output.get('text', '')
+                                    combined_text = final_answer.strip()
+                                    if text_part and text_part not in combined_text:
+                                        combined_text += "\n\n" + text_part
+                                    assistant_message["content"] = combined_text
+
+                                elif 'text' in tool_output:
+                                    assistant_message["content"] = tool_output['text']
+                            except (json.JSONDecodeError, TypeError):
+                                assistant_message["content"] = final_answer
+
+                        if is_cacheable_answer(final_answer):
+                            answer_cache.put(cache_key, dict(assistant_message, output=final_answer))
 
                     if assistant_message["content"]:
                         st.markdown(assistant_message["content"])
                     if assistant_message["image_b64"]:
                         st.image(base64.b64decode(assistant_message["image_b64"]))
                     if assistant_message["table"] is not None and not assistant_message["table"].empty:
-                        display_paginated_dataframe(assistant_message["table"], state_key=f"page_agent_{len(st.session_state.messages)}")
+                        message_index = len(st.session_state.messages)
+                        table = assistant_message["table"]
+                        display_paginated_dataframe(table, state_key=f"page_agent_{message_index}")
+                        download_buttons(lambda: table, f"neuroaihub_answer_{message_index}", f"agent_download_{message_index}", export_columns(table))
+                    if assistant_message.get("full_output") is not None:
+                        display_full_output(assistant_message["full_output"], f"answer_{len(st.session_state.messages)}")
                         
                     st.session_state.memory.save_context(inputs, {"output": final_answer})
                     st.session_state.messages.append(assistant_message)
@@ -258,4 +289,6 @@ else:
                 except Exception as e:
                     error_message = f"An unexpected error occurred: {e}"
                     st.error(error_message)
-                    st.session_state.messages.append({"role": "assistant", "content": error_message})
\ No newline at end of file
+                    st.session_state.messages.append({"role": "assistant", "content": error_message})
+
+profiler.finish()
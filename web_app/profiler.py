@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+
+_local = threading.local()
+
+
+def profiling_enabled() -> bool:
+    """Opt in with ``NEUROAIHUB_PROFILE=1`` or the ``?profile=1`` query parameter."""
+    if os.environ.get("NEUROAIHUB_PROFILE", "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get("profile") == "1"
+
+
+def default_log_path() -> str:
+    cache_dir = os.environ.get("NEUROAIHUB_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "neuroaihub"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.environ.get("NEUROAIHUB_PROFILE_LOG") or os.path.join(cache_dir, "streamlit_profile.jsonl")
+
+
+def note_miss(name: str):
+    """Call first thing in a cached function: its body only runs on a cache miss."""
+    misses = getattr(_local, "misses", None)
+    if misses is not None:
+        misses.add(name)
+
+
+def tracked(name: str, build):
+    """``build`` that reports a miss for ``name`` when a cache has to call it."""
+    def wrapper():
+        note_miss(name)
+        return build()
+    return wrapper
+
+
+class RerunProfiler:
+    """Times the sections of one Streamlit rerun and the cache status of cached resources.
+
+    Disabled profilers cost a context manager per section and record nothing.
+    ``finish`` appends the rerun to a JSONL log and renders the sidebar panel.
+    """
+
+    def __init__(self, enabled: bool = None, log_path: str = None):
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.log_path = log_path or (default_log_path() if self.enabled else None)
+        self.sections = {}
+        self.cache = {}
+        self.counts = {}
+        self._start = time.perf_counter()
+        _local.misses = set() if self.enabled else None
+
+    @contextmanager
+    def section(self, name: str, cache: str = None):
+        """Time the block; with ``cache`` also record whether that resource was a hit or a miss."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + (time.perf_counter() - start) * 1000
+            if cache is not None:
+                self.cache[cache] = "miss" if cache in _local.misses else "hit"
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def record(self) -> dict:
+        return {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "sections": {name: round(ms, 3) for name, ms in self.sections.items()},
+            "cache": dict(self.cache),
+            "counts": dict(self.counts),
+        }
+
+    def finish(self):
+        if not self.enabled:
+            return None
+        record = self.record()
+        _local.misses = None
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write profile log {self.log_path}: {e}")
+        self.render(record)
+        return record
+
+    def render(self, record: dict):
+        with st.sidebar.expander("⏱️ Rerun Profile", expanded=True):
+            st.caption(f"This rerun: **{record['total_ms']:.0f} ms**")
+            rows = [
+                {"section": name, "ms": ms, "cache": record["cache"].get(name, "")}
+                for name, ms in sorted(record["sections"].items(), key=lambda item: -item[1])
+            ]
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+            if record["counts"]:
+                st.caption(", ".join(f"{name}: {value}" for name, value in record["counts"].items()))
+            st.caption("p50/p95 over the last 500 reruns (ms)")
+            st.dataframe(summarize(read_log(self.log_path, last=500)), hide_index=True, use_container_width=True)
+            st.caption(f"Log: `{self.log_path}`")
+
+
+def _tail_lines(f, count: int, block: int = 64 * 1024):
+    """The last ``count`` lines of the binary file ``f``, read backwards in blocks."""
+    f.seek(0, os.SEEK_END)
+    end, data = f.tell(), b""
+    while end > 0 and data.count(b"\n") <= count:
+        start = max(0, end - block)
+        f.seek(start)
+        data = f.read(end - start) + data
+        end = start
+    return data.splitlines()[-count:]
+
+
+def read_log(path: str, last: int = None):
+    """Records of the JSONL log; with ``last`` only the file's tail is read, however long the log is."""
+    records = []
+    try:
+        with open(path, "rb") as f:
+            lines = _tail_lines(f, last) if last else f
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return []
+    return records[-last:] if last else records
+
+
+def summarize(records) -> pd.DataFrame:
+    """Per-section count, p50 and p95 in ms and cache miss rate over ``records``."""
+    rows = []
+    for record in records:
+        rows.append({"section": "total", "ms": record["total_ms"], "miss": None})
+        for name, ms in record.get("sections", {}).items():
+            status = record.get("cache", {}).get(name)
+            rows.append({"section": name, "ms": ms, "miss": None if status is None else status == "miss"})
+    if not rows:
+        return pd.DataFrame(columns=["section", "reruns", "p50_ms", "p95_ms", "miss_rate"])
+
+    df = pd.DataFrame(rows)
+    grouped = df.groupby("section", sort=False)
+    summary = pd.DataFrame({
+        "reruns": grouped["ms"].size(),
+        "p50_ms": grouped["ms"].quantile(0.5).round(1),
+        "p95_ms": grouped["ms"].quantile(0.95).round(1),
+        "miss_rate": grouped["miss"].apply(lambda s: round(s.dropna().astype(float).mean(), 3) if s.notna().any() else None),
+    })
+    return summary.sort_values("p95_ms", ascending=False).reset_index()
+
+
+if __name__ == "__main__":
+    # python profiler.py [log.jsonl] prints the p50/p95 summary of a profile log.
+    log = sys.argv[1] if len(sys.argv) > 1 else default_log_path()
+    print(summarize(read_log(log)).to_string(index=False))
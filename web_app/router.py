@@ -0,0 +1,234 @@
+import re
+import json
+from langchain_core.agents import AgentAction
+
+CATEGORY_CUES = {
+    "Neurodegenerative": r"neurodegenerat|alzheimer|parkinson|dementia|huntington|\bals\b|multiple sclerosis",
+    "Neoplasm": r"neoplasm|tumou?r|glioma|glioblastoma|meningioma|cancer|oncolog|metasta",
+    "Cerebrovascular": r"cerebrovascular|stroke|aneurysm|hemorrhage|haemorrhage|ischemi|vascular",
+    "Psychiatric": r"psychiatr|schizophreni|depressi|bipolar|anxiety|\badhd\b",
+    "Spinal": r"spinal|spine|vertebra",
+    "Neurodevelopmental": r"neurodevelopment|autism|\basd\b|developmental",
+}
+
+PLOT_COLUMNS = {
+    "year": r"\b(year|years|yearly|per year|over time|timeline)\b",
+    "modality": r"\bmodalit",
+    "country": r"\bcountr",
+    "disease": r"\bdisease|\bcondition",
+    "access_type": r"\baccess",
+    "format": r"\bformat|\bfile type",
+    "institution": r"\binstitution|\buniversit",
+    "category": r"\bcategor",
+}
+
+# Words a plain "plot datasets by <attribute>" request is made of. Anything else (a year,
+# "after", "with ...", a modality or disease) is a filter the plot templates would ignore.
+PLOT_WORDS = {
+    "plot", "chart", "graph", "visualize", "visualise", "histogram", "pie", "bar", "distribution",
+    "show", "me", "make", "draw", "create", "give", "can", "you", "please", "how", "are", "is",
+    "a", "an", "the", "of", "by", "per", "for", "in", "across", "over", "all", "each", "every",
+    "number", "count", "counts", "breakdown", "dataset", "datasets", "category", "categories",
+    "year", "years", "yearly", "time", "timeline", "modality", "modalities", "country", "countries",
+    "disease", "diseases", "condition", "conditions", "access", "type", "types", "format", "formats",
+    "file", "institution", "institutions", "university", "universities",
+} | {category.lower() for category in CATEGORY_CUES}
+
+INTENT_PATTERNS = {
+    "summarize": r"\b(summar(y|ize|ise)|overview|describe|tell me about)\b",
+    "find": r"\b(find|search|list|show( me)?|look(ing)? for|get)\b.*\bdatasets?\b|\bdatasets? (with|for|that|from|published)\b",
+    "recommend": r"\b(recommend\w*|suggest\w*|advi[cs]e|should i use|best datasets?|suitable)\b|\bi (want|plan|would like) to (study|research|train|build|develop)\b",
+    "plot": r"\b(plot|chart|graph|visuali[sz]e|histogram|pie|bar chart|distribution)\b",
+}
+
+# A category summary must be asked for as such: "the glioma datasets", "the neoplasm category".
+SUMMARY_SCOPE = r"\b(datasets|categor(y|ies))\b"
+
+# Follow-ups that lean on earlier turns, and requests that need several steps.
+CONTEXT_CUES = r"\b(these|those|them|they|their|the above|above|previous|earlier|last|same|it|its|that one|this one)\b"
+MULTI_STEP_CUES = r"\b(and then|then|compare|comparison|versus|vs\.?|rank|ranking|most|least|average|mean|how many|percentage|correlat)\b"
+
+INTENT_TOOLS = {
+    "summarize": "category_summarizer",
+    "find": "dataset_finder",
+    "recommend": "research_advisor",
+    "plot": "python_code_interpreter",
+}
+
+CLASSIFIER_PROMPT = """Classify the user's request to a neuroradiology dataset assistant with exactly one label:
+summarize - an overview of a whole category of datasets
+find - search or list datasets matching filters
+recommend - dataset recommendations for a research goal
+plot - a chart of dataset counts by one attribute
+other - anything else, follow-up questions or several steps
+Respond with ONLY the label.
+Request: "{query}"
+"""
+
+PLOT_CODE = """df = combined_df{category_filter}
+values = df[{column!r}].dropna().astype(str).str.split(',').explode().str.strip()
+counts = values[~values.str.lower().isin(['not specified', 'nan', ''])].value_counts()
+if len(counts) > 15:
+    counts = pd.concat([counts.iloc[:14], pd.Series({{'Others': counts.iloc[14:].sum()}})])
+counts.plot(kind={kind!r}{extra})
+plt.title({title!r})
+counts"""
+
+YEAR_PLOT_CODE = """df = combined_df{category_filter}
+counts = pd.to_numeric(df['year_clean'], errors='coerce').dropna().astype(int).value_counts().sort_index()
+counts.plot(kind='bar')
+plt.title({title!r})
+counts"""
+
+
+class Route:
+    def __init__(self, intent: str, tool: str, tool_input: str, source: str):
+        self.intent = intent
+        self.tool = tool
+        self.tool_input = tool_input
+        self.source = source
+
+    def __repr__(self):
+        return f"Route({self.intent!r} -> {self.tool}, via {self.source})"
+
+
+def _search(pattern, text):
+    return re.search(pattern, text, re.IGNORECASE) is not None
+
+
+def mentioned_categories(query: str):
+    return [category for category, cue in CATEGORY_CUES.items() if _search(cue, query)]
+
+
+def dataset_name_pattern(names):
+    """One regex matching any registry dataset name, without its parenthesised expansion."""
+    names = {str(name).split("(")[0].strip() for name in names if isinstance(name, str)}
+    names = sorted((n for n in names if len(n) >= 3), key=len, reverse=True)
+    if not names:
+        return None
+    return re.compile(r"(?<!\w)(" + "|".join(map(re.escape, names)) + r")(?!\w)", re.IGNORECASE)
+
+
+def plot_code(query: str, columns=None):
+    """Plotting code for "plot datasets by <attribute>" requests, or ``None``.
+
+    Only requests made of ``PLOT_WORDS`` qualify, so the category is named as
+    such ("neoplasm", not "glioma") and no other filter is dropped.
+    """
+    if any(word not in PLOT_WORDS for word in re.findall(r"[a-z0-9]+", query.lower())):
+        return None
+    dimensions = [name for name, cue in PLOT_COLUMNS.items() if _search(cue, query)]
+    if len(dimensions) != 1:
+        return None
+    dimension = dimensions[0]
+    categories = mentioned_categories(query)
+    if len(categories) > 1:
+        return None
+    category_filter = f"[combined_df['category'] == {categories[0]!r}]" if categories else ""
+    scope = f"{categories[0]} datasets" if categories else "datasets"
+
+    if dimension == "year":
+        return YEAR_PLOT_CODE.format(category_filter=category_filter, title=f"Number of {scope} per year")
+
+    column = dimension
+    if columns is not None and f"{dimension}_clean" in columns:
+        column = f"{dimension}_clean"
+    pie = _search(r"\bpie\b", query)
+    return PLOT_CODE.format(
+        category_filter=category_filter, column=column,
+        kind="pie" if pie else "bar",
+        extra=", autopct='%1.1f%%', ylabel=''" if pie else "",
+        title=f"{scope.capitalize()} by {dimension.replace('_', ' ')}",
+    )
+
+
+def template_answer(tool: str, observation: str) -> str:
+    """Final answer written from the tool output, in place of the agent's last LLM call."""
+    try:
+        output = json.loads(observation)
+    except (TypeError, ValueError):
+        return str(observation)
+    if tool == "category_summarizer":
+        return output.get("summary") or "Here is an overview of the category."
+    if tool == "python_code_interpreter":
+        if output.get("image"):
+            return "Here is the plot you requested."
+        return output.get("text", "")
+    return output.get("summary_text") or "Here are the results."
+
+
+class IntentRouter:
+    """Dispatches clear single-step requests straight to a tool, bypassing the ReAct loop.
+
+    Deterministic rules pick the intent; if they are inconclusive and a
+    ``classifier_llm`` is given, one short classification call decides. Anything
+    ambiguous, multi-step or referring to earlier turns goes to ``agent_executor``.
+    ``invoke`` returns the same ``output``/``intermediate_steps`` shape as the
+    executor, so callers handle both paths alike. Summaries are only routed for
+    a whole category, never when the query names one of ``dataset_names``, given
+    as names or as the ``dataset_name_pattern`` built from them.
+    """
+
+    def __init__(self, agent_executor, classifier_llm=None, columns=None, verbose: bool = False,
+                 dataset_names=None):
+        self.agent_executor = agent_executor
+        self.tools = {tool.name: tool for tool in agent_executor.tools}
+        self.classifier_llm = classifier_llm
+        self.columns = columns
+        self.verbose = verbose
+        if dataset_names is not None and not isinstance(dataset_names, re.Pattern):
+            dataset_names = dataset_name_pattern(dataset_names)
+        self.dataset_names = dataset_names
+
+    def _route_intent(self, intent: str, query: str, source: str):
+        tool = INTENT_TOOLS.get(intent)
+        if tool not in self.tools:
+            return None
+        if intent == "plot":
+            code = plot_code(query, self.columns)
+            return Route(intent, tool, code, source) if code else None
+        if intent == "summarize":
+            if len(mentioned_categories(query)) != 1 or not _search(SUMMARY_SCOPE, query):
+                return None
+            if self.dataset_names is not None and self.dataset_names.search(query):
+                return None
+        return Route(intent, tool, query, source)
+
+    def classify(self, query: str):
+        try:
+            label = self.classifier_llm.invoke(CLASSIFIER_PROMPT.format(query=query)).content
+        except Exception as e:
+            print(f"⚠️ Intent classification failed: {e}")
+            return None
+        label = label.strip().strip('."\'').lower()
+        return label if label in INTENT_TOOLS else None
+
+    def route(self, query: str):
+        """The ``Route`` for ``query``, or ``None`` if the agent should handle it."""
+        if not query or _search(CONTEXT_CUES, query) or _search(MULTI_STEP_CUES, query):
+            return None
+        intents = [intent for intent, pattern in INTENT_PATTERNS.items() if _search(pattern, query)]
+        if "recommend" in intents or "plot" in intents:
+            # "Show a chart of ..." and recommendation requests also read as "find".
+            intents = [i for i in intents if i != "find"]
+        if len(intents) == 1:
+            return self._route_intent(intents[0], query, "rules")
+        if len(intents) > 1 or self.classifier_llm is None:
+            return None
+        intent = self.classify(query)
+        return self._route_intent(intent, query, "classifier") if intent else None
+
+    def invoke(self, inputs: dict):
+        route = self.route(inputs.get("input", ""))
+        if route is None:
+            return self.agent_executor.invoke(inputs)
+        if self.verbose:
+            print(f"🔀 {route}")
+        observation = self.tools[route.tool].run(route.tool_input)
+        action = AgentAction(route.tool, route.tool_input, f"Routed {route.intent} request via {route.source}.")
+        return {
+            "input": inputs.get("input"),
+            "output": template_answer(route.tool, observation),
+            "intermediate_steps": [(action, observation)],
+            "route": route,
+        }
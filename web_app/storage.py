@@ -0,0 +1,534 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+COLUMNS_TO_CLEAN = [
+    "year", "access_type", "institution", "country", "modality", "resolution",
+    "subject_no", "slice_scan_no", "age_range", "disease", "segmentation_mask",
+    "healthy_control", "staging_information", "clinical_data_score",
+    "histopathology", "lab_data"
+]
+NUMERIC_COLUMNS = ["year", "subject_no", "slice_scan_no"]
+FACET_COLUMNS = [
+    "access_type", "institution", "country", "modality", "format", "segmentation_mask",
+    "disease", "healthy_control", "staging_information", "clinical_data_score",
+    "histopathology", "lab_data"
+]
+# Low-cardinality columns (raw and ``_clean``) kept as ``category`` dtype in memory.
+CATEGORICAL_COLUMNS = [
+    "category", "access_type", "country", "format", "segmentation_mask", "healthy_control",
+    "staging_information", "clinical_data_score", "histopathology", "lab_data"
+]
+MISSING_OPTIONS = ("not specified", "nan", "")
+OPERATORS = (">", ">=", "<", "<=", "==")
+
+
+def clean_sheets(dataframes):
+    for sheet, df in dataframes.items():
+        for col in COLUMNS_TO_CLEAN:
+            if col in df.columns:
+                df[col] = df[col].astype(str).replace("nan", "", regex=False).fillna("")
+                df[f"{col}_clean"] = df[col].str.replace(r"\s*\(.*\)", "", regex=True).str.strip()
+
+        for col in NUMERIC_COLUMNS:
+            clean_col = f"{col}_clean"
+            if clean_col in df.columns:
+                df[clean_col] = pd.to_numeric(df[clean_col], errors="coerce")
+    return dataframes
+
+
+def read_xlsx(path):
+    """Cleaned per-category DataFrames and sheet names of a registry workbook."""
+    xls = pd.ExcelFile(path, engine="openpyxl")
+    sheet_names = xls.sheet_names
+    dataframes = {
+        sheet: pd.read_excel(xls, sheet_name=sheet).assign(category=sheet)
+        for sheet in sheet_names
+    }
+    return clean_sheets(dataframes), sheet_names
+
+
+def _arrow_string_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype("pyarrow")
+
+
+def compact_frame(df: pd.DataFrame, max_category_ratio: float = 0.5) -> pd.DataFrame:
+    """``df`` with ``CATEGORICAL_COLUMNS`` as categoricals and other text as Arrow strings.
+
+    Columns with more distinct values than ``max_category_ratio`` of the rows
+    stay strings; Arrow strings need the optional ``pyarrow`` package.
+    """
+    strings = _arrow_string_dtype()
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        base = col[:-len("_clean")] if col.endswith("_clean") else col
+        if base in CATEGORICAL_COLUMNS and df[col].nunique() <= max(1, len(df) * max_category_ratio):
+            df[col] = df[col].astype("category")
+        elif strings is not None and df[col].dtype != strings:
+            df[col] = df[col].astype(strings)
+    return df
+
+
+class CategoryViews(Mapping):
+    """Per-category DataFrames as row slices of one backing frame, in sheet order.
+
+    Rows of a category are contiguous in ``combined_df``, so each frame is a
+    view built on access; only the backing frame holds data.
+    """
+
+    def __init__(self, frame: pd.DataFrame, sheet_names, sheet_columns=None):
+        self.frame = frame
+        self.sheet_columns = sheet_columns or {}
+        categories = frame["category"].astype(str).to_numpy()
+        self._rows = {}
+        for sheet in sheet_names:
+            positions = np.flatnonzero(categories == sheet)
+            contiguous = len(positions) and positions[-1] - positions[0] + 1 == len(positions)
+            self._rows[sheet] = slice(positions[0], positions[-1] + 1) if contiguous else positions
+
+    def __getitem__(self, sheet):
+        view = self.frame.iloc[self._rows[sheet]]
+        columns = self.sheet_columns.get(sheet)
+        if columns is not None and list(columns) != list(view.columns):
+            view = view[columns]
+        # Registry-wide categories would show up as zero counts and empty plot bars.
+        unused = {col: view[col].cat.remove_unused_categories()
+                  for col in view.columns if isinstance(view[col].dtype, pd.CategoricalDtype)}
+        view = view.assign(**unused) if unused else view
+        view.index = pd.RangeIndex(len(view))
+        return view
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def plain_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with categorical columns back as strings, for user code that counts or plots them."""
+    columns = {col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df.astype(columns) if columns else df
+
+
+def memory_usage(dataframes, combined_df) -> int:
+    """Deep bytes held by a ``load`` result; ``CategoryViews`` hold no data of their own."""
+    frames = [combined_df] if isinstance(dataframes, CategoryViews) else [combined_df, *dataframes.values()]
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames))
+
+
+def facet_column(columns, name):
+    return f"{name}_clean" if f"{name}_clean" in columns else name
+
+
+def split_options(values):
+    for value in values:
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            continue
+        for option in str(value).split(","):
+            option = option.strip()
+            if option.lower() not in MISSING_OPTIONS:
+                yield option
+
+
+def _like(value: str) -> str:
+    value = str(value).lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{value}%"
+
+
+def _file_signature(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class SQLiteStore:
+    """SQLite copy of the registry with indexed facets for filter push-down.
+
+    ``datasets`` holds one row per dataset with the same columns ``load_data``
+    produces; ``facets`` holds the comma-separated values of the filterable
+    columns, one row per value. The store is rebuilt from the workbook when
+    the workbook's size or mtime changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._meta_cache = {}
+
+    def _meta(self, name):
+        if name not in self._meta_cache:
+            with self._lock:
+                row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+            self._meta_cache[name] = json.loads(row[0]) if row else None
+        return self._meta_cache[name]
+
+    @property
+    def sheet_names(self):
+        return self._meta("sheet_names") or []
+
+    @property
+    def columns(self):
+        return self._meta("columns") or []
+
+    def is_stale(self, xlsx_path: str) -> bool:
+        return (self._meta("source_path") != os.path.abspath(xlsx_path)
+                or self._meta("source_signature") != _file_signature(xlsx_path))
+
+    def sync(self, xlsx_path: str):
+        if self.is_stale(xlsx_path):
+            self.import_xlsx(xlsx_path)
+        return self
+
+    def import_xlsx(self, xlsx_path: str):
+        dataframes, sheet_names = read_xlsx(xlsx_path)
+        self.import_dataframes(dataframes, sheet_names, {
+            "source_path": os.path.abspath(xlsx_path),
+            "source_signature": _file_signature(xlsx_path),
+        })
+
+    def import_dataframes(self, dataframes, sheet_names, meta: dict = None):
+        """Replace the store's contents with cleaned per-category DataFrames."""
+        combined_df = pd.concat(dataframes.values(), ignore_index=True)
+        combined_df.insert(0, "id", range(len(combined_df)))
+
+        facet_rows = []
+        for name in FACET_COLUMNS:
+            col = facet_column(combined_df.columns, name)
+            if col not in combined_df.columns:
+                continue
+            for dataset_id, value in zip(combined_df["id"], combined_df[col]):
+                facet_rows.extend((int(dataset_id), col, v, v.lower()) for v in split_options([value]))
+
+        meta = {
+            **(meta or {}),
+            "sheet_names": sheet_names,
+            "columns": [c for c in combined_df.columns if c != "id"],
+            "sheet_columns": {sheet: list(df.columns) for sheet, df in dataframes.items()},
+        }
+        with self._lock:
+            self.conn.execute("DROP TABLE IF EXISTS datasets")
+            self.conn.execute("DROP TABLE IF EXISTS facets")
+            combined_df.to_sql("datasets", self.conn, index=False)
+            self.conn.executescript("""
+                CREATE UNIQUE INDEX idx_datasets_id ON datasets (id);
+                CREATE INDEX idx_datasets_category ON datasets (category);
+                CREATE TABLE facets (dataset_id INTEGER, column TEXT, value TEXT, value_lower TEXT);
+            """)
+            for col in ("year_clean", "subject_no_clean"):
+                if col in combined_df.columns:
+                    self.conn.execute(f'CREATE INDEX idx_datasets_{col} ON datasets ("{col}")')
+            self.conn.executemany("INSERT INTO facets VALUES (?, ?, ?, ?)", facet_rows)
+            self.conn.executescript("""
+                CREATE INDEX idx_facets_value ON facets (column, value_lower);
+                CREATE INDEX idx_facets_dataset ON facets (dataset_id);
+            """)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in meta.items()],
+            )
+            self.conn.commit()
+        self._meta_cache = {}
+
+    def _read(self, sql: str, params=()):
+        with self._lock:
+            df = pd.read_sql_query(sql, self.conn, params=params)
+        return df.drop(columns="id", errors="ignore")
+
+    def load(self, compact: bool = False):
+        """``(dataframes, combined_df, sheet_names)`` exactly as ``load_data`` returns them.
+
+        With ``compact``, ``combined_df`` goes through ``compact_frame`` and is the
+        only copy of the data: ``dataframes`` are ``CategoryViews`` of it.
+        """
+        combined = self._read("SELECT * FROM datasets ORDER BY id")
+        sheet_columns = self._meta("sheet_columns")
+        if compact:
+            combined = compact_frame(combined)
+            return CategoryViews(combined, self.sheet_names, sheet_columns), combined, list(self.sheet_names)
+        dataframes = {
+            sheet: combined[combined["category"] == sheet][sheet_columns[sheet]].reset_index(drop=True)
+            for sheet in self.sheet_names
+        }
+        combined_df = pd.concat(dataframes.values(), ignore_index=True)
+        return dataframes, combined_df, list(self.sheet_names)
+
+    def export_xlsx(self, path: str):
+        """Write the registry back to a workbook with one sheet per category."""
+        dataframes, _, sheet_names = self.load()
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for sheet in sheet_names:
+                df = dataframes[sheet]
+                df = df[[c for c in df.columns if c != "category" and not c.endswith("_clean")]]
+                df = df.replace("", None)
+                for col in df.columns:
+                    numeric = pd.to_numeric(df[col], errors="coerce")
+                    if numeric.notna().sum() == df[col].notna().sum():
+                        df[col] = numeric
+                df.to_excel(writer, sheet_name=sheet, index=False)
+
+    def _select(self, category=None, contains=None, equals=None, ranges=None, columns=None):
+        known = set(self.columns)
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(str(category))
+        for col, values in (contains or {}).items():
+            if col not in known:
+                continue
+            values = [values] if isinstance(values, str) else list(values)
+            parts = []
+            for value in values:
+                if col in self._facet_columns() and "," not in str(value):
+                    parts.append("id IN (SELECT dataset_id FROM facets WHERE column = ? AND value_lower LIKE ? ESCAPE '\\')")
+                    params.extend([col, _like(value)])
+                else:
+                    parts.append(f"lower(\"{col}\") LIKE ? ESCAPE '\\'")
+                    params.append(_like(value))
+            if parts:
+                clauses.append("(" + " OR ".join(parts) + ")")
+        for col, value in (equals or {}).items():
+            if col in known:
+                clauses.append(f"lower(\"{col}\") = ?")
+                params.append(str(value).lower())
+        for col, conditions in (ranges or {}).items():
+            for op, value in ([conditions] if isinstance(conditions, tuple) else conditions):
+                if col in known and op in OPERATORS and isinstance(value, (int, float)):
+                    clauses.append(f"\"{col}\" {'=' if op == '==' else op} ?")
+                    params.append(value)
+
+        select = ", ".join(f'"{c}"' for c in columns if c in known) if columns else "*"
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return f"SELECT {select} FROM datasets{where} ORDER BY id", params
+
+    def query(self, category=None, contains=None, equals=None, ranges=None, columns=None):
+        """Rows matching every condition, fetched with one SQL query.
+
+        ``contains`` maps a column to values of which any must occur as a
+        case-insensitive substring, ``equals`` to a case-insensitive full
+        match and ``ranges`` to one or more ``(operator, number)`` pairs.
+        """
+        return self._read(*self._select(category, contains, equals, ranges, columns))
+
+    def iter_query(self, category=None, contains=None, equals=None, ranges=None, columns=None,
+                   chunk_size: int = 5000):
+        """``query`` as DataFrames of ``chunk_size`` rows, read on a private connection.
+
+        The shared connection stays free while a slow consumer (an export or a
+        download) is still reading.
+        """
+        sql, params = self._select(category, contains, equals, ranges, columns)
+        conn = sqlite3.connect(self.path)
+        try:
+            for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunk_size):
+                yield chunk.drop(columns="id", errors="ignore")
+        finally:
+            conn.close()
+
+    def _find_conditions(self, filters: dict):
+        columns = self.columns
+        category, contains, ranges = None, {}, {}
+        for key, value in filters.items():
+            if key == "category":
+                category = value
+            elif isinstance(value, dict):
+                ranges[facet_column(columns, key)] = (value.get("operator"), value.get("value"))
+            else:
+                contains[facet_column(columns, key)] = [str(value)]
+        return {"category": category, "contains": contains, "ranges": ranges}
+
+    def find(self, filters: dict):
+        """Apply the ``dataset_finder`` filter JSON (``{field: value | {operator, value}}``) in SQL."""
+        return self.query(**self._find_conditions(filters))
+
+    def iter_find(self, filters: dict, columns=None, chunk_size: int = 5000):
+        return self.iter_query(**self._find_conditions(filters), columns=columns, chunk_size=chunk_size)
+
+    def _facet_columns(self):
+        return {facet_column(self.columns, name) for name in FACET_COLUMNS}
+
+    def options(self, column: str):
+        """Sorted distinct comma-separated values of ``column``, as ``get_unique_options_from_column``."""
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT value FROM facets WHERE column = ?", (column,)).fetchall()
+        return sorted(r[0] for r in rows)
+
+    def facet_counts(self, column: str, category: str = None) -> pd.Series:
+        """Value counts of the comma-separated values of ``column``, most common first."""
+        sql = "SELECT value, COUNT(*) AS n FROM facets WHERE column = ?"
+        params = [column]
+        if category is not None:
+            sql += " AND dataset_id IN (SELECT id FROM datasets WHERE category = ?)"
+            params.append(category)
+        with self._lock:
+            rows = self.conn.execute(sql + " GROUP BY value ORDER BY n DESC, value", params).fetchall()
+        return pd.Series([n for _, n in rows], index=[v for v, _ in rows], dtype="int64")
+
+    def year_range(self):
+        with self._lock:
+            return self.conn.execute("SELECT MIN(year_clean), MAX(year_clean) FROM datasets").fetchone()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def default_store_path(xlsx_path: str, version: str = None) -> str:
+    cache_dir = os.environ.get("NEUROAIHUB_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "neuroaihub"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    key = hashlib.sha1(os.path.abspath(xlsx_path).encode("utf-8")).hexdigest()[:12]
+    if version:
+        key = f"{key}_{version}"
+    return os.path.join(cache_dir, f"registry_{key}.sqlite3")
+
+
+def get_store(xlsx_path: str, path: str = None) -> SQLiteStore:
+    return SQLiteStore(path or default_store_path(xlsx_path)).sync(xlsx_path)
+
+
+def file_version(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:12]
+
+
+class Snapshot:
+    """One immutable version of the registry: its store, DataFrames and derived caches."""
+
+    def __init__(self, version: str, store: SQLiteStore):
+        self.version = version
+        self.store = store
+        self.dataframes, self.combined_df, self.sheet_names = store.load(compact=True)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def cached(self, key, build):
+        """Memoize ``build()`` for the lifetime of this version."""
+        with self._cache_lock:
+            if key in self._cache:
+                return self._cache[key]
+        value = build()
+        with self._cache_lock:
+            return self._cache.setdefault(key, value)
+
+    def options(self, column: str):
+        return self.cached(("options", column), lambda: self.store.options(column))
+
+    def memory_usage(self) -> int:
+        return memory_usage(self.dataframes, self.combined_df)
+
+    def close(self):
+        """Release the SQLite connection and derived caches once the version is retired."""
+        with self._cache_lock:
+            self._cache.clear()
+        self.store.close()
+
+
+class RegistryHandle:
+    """Versioned handle on the registry that follows the workbook without restarts.
+
+    ``current()`` returns the latest ``Snapshot``. A watcher thread polls the
+    workbook's size and mtime; when its content hash changes, the new version
+    is imported into its own SQLite file and loaded in the background, then
+    swapped in with a single assignment. Callers that already hold the old
+    snapshot keep using it until they ask for ``current()`` again; it is closed
+    at the swap after that. ``on_swap(previous, snapshot)`` runs after each swap
+    so callers can drop resources built for the old version. Only version files
+    this handle created are deleted; other processes may share the cache directory.
+    """
+
+    def __init__(self, xlsx_path: str, poll_interval: float = 30.0, keep_versions: int = 2, on_swap=None):
+        self.xlsx_path = xlsx_path
+        self.poll_interval = poll_interval
+        self.keep_versions = keep_versions
+        self.on_swap = on_swap
+        self._retired = []
+        self._created = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = _file_signature(xlsx_path)
+        self._snapshot = self._build(file_version(xlsx_path))
+
+    def _build(self, version: str) -> Snapshot:
+        path = default_store_path(self.xlsx_path, version)
+        if not os.path.exists(path):
+            self._created.add(os.path.abspath(path))
+        store = SQLiteStore(path).sync(self.xlsx_path)
+        return Snapshot(version, store)
+
+    def current(self) -> Snapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.version
+
+    def refresh(self) -> bool:
+        """Load a new snapshot if the workbook changed; returns whether a swap happened."""
+        with self._lock:
+            signature = _file_signature(self.xlsx_path)
+            if signature == self._signature:
+                return False
+            version = file_version(self.xlsx_path)
+            if version == self._snapshot.version:
+                self._signature = signature
+                return False
+            snapshot = self._build(version)
+            previous, self._snapshot = self._snapshot, snapshot
+            self._signature = signature
+            # The previous version stays open for callers that still hold it until the next swap.
+            self._retired.append(previous)
+            closing = self._retired[:-max(1, self.keep_versions - 1)]
+            self._retired = self._retired[len(closing):]
+        print(f"🔄 Registry updated from version {previous.version} to {snapshot.version}.")
+        for old in closing:
+            old.close()
+        self._remove_old_stores()
+        if self.on_swap is not None:
+            self.on_swap(previous, snapshot)
+        return True
+
+    def _remove_old_stores(self):
+        with self._lock:
+            in_use = {os.path.abspath(s.store.path) for s in [self._snapshot, *self._retired]}
+            unused = self._created - in_use
+            self._created -= unused
+        for path in unused:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Registry reload failed, keeping version {self.version}: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="registry-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from export import EXPORT_FORMATS, available_formats, export_to_bytes
 
 displaying_columns = [
     "category", "dataset_name", "doi", "url", "year", "access_type",
@@ -14,15 +15,8 @@ def get_unique_options_from_column(df_column):
     unique_options = options[~options.str.lower().isin(['not specified', 'nan', ''])]
     return sorted(list(unique_options.unique()))
 
-def display_paginated_dataframe(df: pd.DataFrame, state_key: str, page_size: int = 5):
-    """
-    Renders a paginated dataframe with clickable links and number formatting.
-    """
-    if state_key not in st.session_state:
-        st.session_state[state_key] = 1
-
-    current_page = st.session_state[state_key]
-    total_pages = max(1, (len(df) - 1) // page_size + 1)
+def format_page(df: pd.DataFrame, current_page: int, page_size: int = 5) -> pd.DataFrame:
+    """Slice one page of ``df`` and format it for display."""
     start_index = (current_page - 1) * page_size
     end_index = start_index + page_size
 
@@ -44,6 +38,30 @@ def display_paginated_dataframe(df: pd.DataFrame, state_key: str, page_size: int
             df_display[col] = df_display[col].apply(
                 lambda x: str(int(x)) if str(x).replace('.', '', 1).isdigit() else str(x)
             )
+    return df_display
+
+
+def top_with_others(full_series: pd.Series, top: int = 5) -> pd.Series:
+    """Keep the ``top`` largest counts and fold the rest into ``Others``."""
+    if len(full_series) > top:
+        plot_series = full_series.nlargest(top)
+        others_sum = full_series.iloc[top:].sum()
+        if others_sum > 0:
+            plot_series = pd.concat([plot_series, pd.Series([others_sum], index=['Others'])])
+    else:
+        plot_series = full_series
+    return plot_series.sort_values(ascending=False)
+
+def display_paginated_dataframe(df: pd.DataFrame, state_key: str, page_size: int = 5):
+    """
+    Renders a paginated dataframe with clickable links and number formatting.
+    """
+    if state_key not in st.session_state:
+        st.session_state[state_key] = 1
+
+    current_page = st.session_state[state_key]
+    total_pages = max(1, (len(df) - 1) // page_size + 1)
+    df_display = format_page(df, current_page, page_size)
 
     column_config = {
         "url": st.column_config.LinkColumn( "URL", display_text="🔗 Link", width="small"),
@@ -62,3 +80,44 @@ def display_paginated_dataframe(df: pd.DataFrame, state_key: str, page_size: int
         st.session_state[state_key] += 1; st.rerun()
     if c5.button("Last ⏭️", key=f"last_{state_key}", disabled=(current_page == total_pages)):
         st.session_state[state_key] = total_pages; st.rerun()
+
+
+def export_columns(df: pd.DataFrame):
+    """Registry columns of ``df`` in display order, or ``None`` to keep all of them."""
+    columns = [col for col in displaying_columns if col in df.columns]
+    return columns or None
+
+
+def display_full_output(full_output, key: str):
+    """The complete python_code_interpreter result that was summarized for the LLM."""
+    with st.expander("📄 Full result"):
+        if isinstance(full_output, pd.DataFrame):
+            st.dataframe(full_output, hide_index=True, use_container_width=True)
+            download_buttons(lambda: full_output, f"neuroaihub_result_{key}", f"result_download_{key}")
+        else:
+            st.code(str(full_output), language=None)
+
+
+def download_payload(source, fmt: str, columns=None) -> bytes:
+    """What a download button serves: the export of ``source()`` as bytes."""
+    return export_to_bytes(source(), fmt, columns)
+
+
+def download_buttons(source, file_stem: str, key: str, columns=None):
+    """One download button per export format.
+
+    ``source`` is a zero-argument callable returning a DataFrame or DataFrame
+    chunks; it only runs when a button is clicked. Streamlit sends downloads
+    as bytes, so the whole file is built in memory on the server.
+    """
+    formats = available_formats()
+    for col, fmt in zip(st.columns(len(formats) + 2), formats):
+        mime, extension = EXPORT_FORMATS[fmt]
+        col.download_button(
+            f"⬇️ {fmt.upper()}",
+            data=lambda fmt=fmt: download_payload(source, fmt, columns),
+            file_name=f"{file_stem}.{extension}",
+            mime=mime,
+            key=f"{key}_{fmt}",
+            on_click="ignore",
+        )